@@ -0,0 +1,62 @@
+"""Benchmark: model load time and memory, resolved by name vs. from the mmap registry.
+
+Each load runs in a fresh subprocess. The first run of each mode is the cold
+load, later runs are warm (files already in the OS page cache). RssAnon is
+private memory per process; RssFile is file-backed memory that concurrent
+workers share.
+
+Usage:
+    python -m src.model_registry pin embedding      # once, with network
+    python benchmarks/bench_model_load.py --runs 3
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import sys, time, json
+sys.path.insert(0, {base!r})
+start = time.perf_counter()
+if {mode!r} == "registry":
+    from src.model_registry import load_model
+    model = load_model("embedding")
+else:
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer("all-MiniLM-L6-v2")
+load_s = time.perf_counter() - start
+model.encode(["warm up"])
+mem = {{}}
+with open("/proc/self/status") as f:
+    for line in f:
+        key = line.split(":")[0]
+        if key in ("RssAnon", "RssFile"):
+            mem[key] = int(line.split()[1]) // 1024
+print(json.dumps({{"load_s": load_s, **mem}}))
+"""
+
+def run_once(mode):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD.format(base=BASE_DIR, mode=mode)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Model load benchmark")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", default=["by-name", "registry"])
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'run':>5}{'load(s)':>10}{'RssAnon(MB)':>13}{'RssFile(MB)':>13}")
+    for mode in args.modes:
+        for i in range(args.runs):
+            r = run_once(mode)
+            label = "cold" if i == 0 else "warm"
+            print(f"{mode:<10}{label:>5}{r['load_s']:>10.2f}{r.get('RssAnon', 0):>13}{r.get('RssFile', 0):>13}")
+
+if __name__ == "__main__":
+    main()
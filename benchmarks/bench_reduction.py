@@ -0,0 +1,63 @@
+"""Benchmark: clustering time and theme agreement with vs. without dimensionality reduction.
+
+Usage:
+    python benchmarks/bench_reduction.py                 # embeds data/processed/reviews_clean.csv
+    python benchmarks/bench_reduction.py --synthetic 20000
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.datasets import make_blobs
+from sklearn.metrics import adjusted_rand_score
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.clustering import build_reducer
+
+def load_embeddings(args):
+    if args.synthetic:
+        X, _ = make_blobs(n_samples=args.synthetic, n_features=384, centers=args.k,
+                          cluster_std=4.0, random_state=42)
+        return X.astype(np.float32)
+
+    import pandas as pd
+    from sentence_transformers import SentenceTransformer
+    df = pd.read_csv(os.path.join(BASE_DIR, "data", "processed", "reviews_clean.csv"))
+    model = SentenceTransformer('all-MiniLM-L6-v2')
+    return model.encode(df['review_text'].astype(str).tolist(), show_progress_bar=True)
+
+def time_kmeans(X, k):
+    start = time.perf_counter()
+    labels = KMeans(n_clusters=k, random_state=42, n_init=10).fit_predict(X)
+    return labels, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Dimensionality reduction benchmark")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic 384-dim vectors")
+    parser.add_argument("--k", type=int, default=10, help="Number of clusters")
+    parser.add_argument("--dims", type=int, nargs="+", default=[16, 32, 64, 128])
+    args = parser.parse_args()
+
+    X = load_embeddings(args)
+    print(f"Embeddings: {X.shape[0]} x {X.shape[1]}")
+
+    base_labels, base_time = time_kmeans(X, args.k)
+    print(f"{'method':<18}{'dims':>6}{'fit(s)':>10}{'kmeans(s)':>11}{'speedup':>9}{'ARI':>7}")
+    print(f"{'baseline':<18}{X.shape[1]:>6}{0:>10.3f}{base_time:>11.3f}{1:>9.2f}{1:>7.3f}")
+
+    for method in ("pca", "random_projection"):
+        for dim in args.dims:
+            start = time.perf_counter()
+            reduced = build_reducer(method, dim).fit_transform(X)
+            fit_time = time.perf_counter() - start
+            labels, km_time = time_kmeans(np.ascontiguousarray(reduced, dtype=np.float32), args.k)
+            ari = adjusted_rand_score(base_labels, labels)
+            speedup = base_time / (fit_time + km_time)
+            print(f"{method:<18}{dim:>6}{fit_time:>10.3f}{km_time:>11.3f}{speedup:>9.2f}{ari:>7.3f}")
+
+if __name__ == "__main__":
+    main()
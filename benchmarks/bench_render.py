@@ -0,0 +1,88 @@
+"""Benchmark: detailed-breakdown render time with and without the cached font template.
+
+All reports render in one process, which is the case the template cache helps.
+The cold figure is the one-PDF cost a pipeline run actually pays.
+
+Usage:
+    python benchmarks/bench_render.py --reports 30
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import pandas as pd
+from fpdf import FPDF
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.report_gen import build_breakdown_document
+from src.report_render import (
+    FONT_PATH, render_breakdown_markdown, render_breakdown_pdf, clear_pdf_template_cache
+)
+
+def load_themes(df):
+    with open(os.path.join(BASE_DIR, "config", "product_taxonomy.json"), "r") as f:
+        taxonomy = json.load(f)
+    themes = [
+        {
+            "theme_name": name,
+            "description": taxonomy.get(name, {}).get("description", "Emerging issues or uncategorized feedback."),
+            "count": len(group),
+        }
+        for name, group in df.groupby('theme_name')
+    ]
+    return sorted(themes, key=lambda t: t['count'], reverse=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Report rendering benchmark")
+    parser.add_argument("--reports", type=int, default=30, help="Number of app reports to render")
+    args = parser.parse_args()
+
+    df = pd.read_csv(os.path.join(BASE_DIR, "data", "processed", "reviews_with_themes.csv"))
+    themes = load_themes(df)
+    out_dir = tempfile.mkdtemp()
+
+    # Font setup as it was done per report before: three parses of the same TTF
+    start = time.perf_counter()
+    for _ in range(args.reports):
+        pdf = FPDF()
+        for style in ("", "B", "I"):
+            pdf.add_font("DejaVu", style, FONT_PATH)
+    legacy_font = (time.perf_counter() - start) / args.reports
+
+    start = time.perf_counter()
+    for _ in range(args.reports):
+        doc = build_breakdown_document(df, themes, "Bench App")
+    build_time = (time.perf_counter() - start) / args.reports
+
+    start = time.perf_counter()
+    for _ in range(args.reports):
+        render_breakdown_markdown(doc)
+    md_time = (time.perf_counter() - start) / args.reports
+
+    # Cold: font parsed for every report (cache cleared each time)
+    start = time.perf_counter()
+    for i in range(args.reports):
+        clear_pdf_template_cache()
+        render_breakdown_pdf(doc, os.path.join(out_dir, f"cold_{i}.pdf"))
+    cold_pdf = (time.perf_counter() - start) / args.reports
+
+    # Warm: font template cached across reports
+    render_breakdown_pdf(doc, os.path.join(out_dir, "prime.pdf"))
+    start = time.perf_counter()
+    for i in range(args.reports):
+        render_breakdown_pdf(doc, os.path.join(out_dir, f"warm_{i}.pdf"))
+    warm_pdf = (time.perf_counter() - start) / args.reports
+
+    print(f"Per report, averaged over {args.reports} reports ({len(df)} reviews):")
+    print(f"  legacy font setup (3x add_font): {legacy_font * 1000:8.2f} ms")
+    print(f"  build document model:            {build_time * 1000:8.2f} ms")
+    print(f"  render markdown:                 {md_time * 1000:8.2f} ms")
+    print(f"  render PDF, cold font:           {cold_pdf * 1000:8.2f} ms")
+    print(f"  render PDF, cached font:         {warm_pdf * 1000:8.2f} ms")
+
+if __name__ == "__main__":
+    main()
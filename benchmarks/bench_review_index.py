@@ -0,0 +1,83 @@
+"""Benchmark: exact vs. IVF similarity search in the review index.
+
+Builds a throwaway index (synthetic clustered vectors, or the real embeddings
+of data/processed/reviews_with_themes.csv) and reports per-query latency and
+recall@k of the approximate search against the exact brute-force result.
+
+Usage:
+    python benchmarks/bench_review_index.py --synthetic 1000000 --nprobe 4 8 16 32
+    python benchmarks/bench_review_index.py
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.review_index import ReviewIndex
+
+def synthetic_corpus(n, dim=384, centers=200, seed=42):
+    rng = np.random.default_rng(seed)
+    means = rng.normal(size=(centers, dim)).astype(np.float32)
+    labels = rng.integers(0, centers, size=n)
+    vectors = means[labels] + rng.normal(scale=1.5, size=(n, dim)).astype(np.float32)
+    df = pd.DataFrame({
+        'review_id': np.arange(n).astype(str),
+        'date': pd.Timestamp("2026-01-01") + pd.to_timedelta(rng.integers(0, 365, size=n), unit="D"),
+        'rating': rng.integers(1, 6, size=n),
+        'theme_name': [f"Theme {l % 8}" for l in labels],
+        'review_text': [f"synthetic review {i}" for i in range(n)],
+    })
+    return vectors, df
+
+def real_corpus():
+    from src.model_registry import load_sentence_model
+    df = pd.read_csv(os.path.join(BASE_DIR, "data", "processed", "reviews_with_themes.csv"))
+    vectors = load_sentence_model().encode(df['review_text'].astype(str).tolist(), show_progress_bar=True)
+    return vectors, df
+
+def timed_search(index, queries, k, **kwargs):
+    results, times = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        results.append(set(index.search(q, k=k, **kwargs)['review_id'].astype(str)))
+        times.append((time.perf_counter() - t0) * 1000)
+    return results, np.array(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Review index latency / recall benchmark")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic vectors instead of real reviews")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--theme", help="Also apply a theme filter to every query")
+    args = parser.parse_args()
+
+    vectors, df = synthetic_corpus(args.synthetic) if args.synthetic else real_corpus()
+    rng = np.random.default_rng(0)
+    queries = vectors[rng.choice(len(vectors), args.queries, replace=False)]
+    queries = queries + rng.normal(scale=0.5, size=queries.shape).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = ReviewIndex(index_dir=tmp)
+        t0 = time.perf_counter()
+        index.add(vectors, df)
+        index.ivf  # trains here when the corpus is below INDEX_EXACT_MAX
+        print(f"Indexed {len(index)} vectors (incl. IVF build) in {time.perf_counter() - t0:.2f}s")
+
+        exact, times = timed_search(index, queries, args.k, theme=args.theme, mode="exact")
+        print(f"\n{'mode':<14}{'p50 ms':>10}{'p95 ms':>10}{'recall@' + str(args.k):>12}")
+        print(f"{'exact':<14}{np.percentile(times, 50):>10.2f}{np.percentile(times, 95):>10.2f}{1.0:>12.3f}")
+        for nprobe in args.nprobe:
+            approx, times = timed_search(index, queries, args.k, theme=args.theme, mode="ann", nprobe=nprobe)
+            recall = np.mean([len(a & e) / max(len(e), 1) for a, e in zip(approx, exact)])
+            label = f"ivf nprobe={nprobe}"
+            print(f"{label:<14}{np.percentile(times, 50):>10.2f}{np.percentile(times, 95):>10.2f}{recall:>12.3f}")
+
+if __name__ == "__main__":
+    main()
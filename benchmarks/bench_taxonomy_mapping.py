@@ -0,0 +1,76 @@
+"""Benchmark: keyword vs. embedding-prototype taxonomy mapping.
+
+Reports agreement with the keyword mapper, how many clusters/reviews end up in
+"Other / Emerging Issues", and the cost of each mapping step.
+
+Usage:
+    python benchmarks/bench_taxonomy_mapping.py --k 10 --thresholds 0.2 0.3 0.4
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sentence_transformers import SentenceTransformer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.analyzer import extract_cluster_terms, map_terms_to_taxonomy, load_taxonomy
+from src.taxonomy_prototypes import (
+    OTHER_THEME, build_prototypes, cluster_centroids, map_to_prototypes
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Taxonomy mapping agreement benchmark")
+    parser.add_argument("--k", type=int, default=10, help="Number of clusters")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.2, 0.3, 0.4])
+    args = parser.parse_args()
+
+    df = pd.read_csv(os.path.join(BASE_DIR, "data", "processed", "reviews_clean.csv"))
+    texts = df['review_text'].astype(str).tolist()
+    taxonomy = load_taxonomy()
+
+    model = SentenceTransformer('all-MiniLM-L6-v2')
+    embeddings = model.encode(texts, show_progress_bar=True)
+    labels = KMeans(n_clusters=args.k, random_state=42, n_init=10).fit_predict(embeddings)
+    sizes = np.bincount(labels, minlength=args.k)
+
+    start = time.perf_counter()
+    cluster_terms = extract_cluster_terms(texts, labels, args.k)
+    keyword = [map_terms_to_taxonomy(cluster_terms[i], taxonomy) for i in range(args.k)]
+    keyword_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    theme_names, prototypes = build_prototypes(model, taxonomy)
+    build_time = time.perf_counter() - start
+
+    centroids = cluster_centroids(embeddings, labels, args.k)
+    keyword_other = sum(sizes[i] for i in range(args.k) if keyword[i] == OTHER_THEME)
+
+    print(f"\n{len(texts)} reviews, k={args.k}")
+    print(f"keyword mapping:       {keyword_time * 1000:8.2f} ms, "
+          f"{sum(t == OTHER_THEME for t in keyword)} clusters / {keyword_other} reviews in Other")
+    print(f"prototype build (once): {build_time * 1000:7.2f} ms\n")
+
+    print(f"{'threshold':>9}{'map(ms)':>9}{'cluster agree':>15}{'Other clusters':>16}{'Other reviews':>15}{'review agree':>14}")
+    for threshold in args.thresholds:
+        start = time.perf_counter()
+        proto, _ = map_to_prototypes(centroids, theme_names, prototypes, threshold)
+        map_time = time.perf_counter() - start
+
+        # Agreement only over clusters the keyword mapper could place
+        placed = [i for i in range(args.k) if keyword[i] != OTHER_THEME]
+        agree = np.mean([proto[i] == keyword[i] for i in placed]) if placed else float("nan")
+        proto_other = sum(sizes[i] for i in range(args.k) if proto[i] == OTHER_THEME)
+
+        review_proto, _ = map_to_prototypes(embeddings, theme_names, prototypes, threshold)
+        review_agree = np.mean([review_proto[j] == keyword[labels[j]] for j in range(len(texts))])
+
+        print(f"{threshold:>9.2f}{map_time * 1000:>9.3f}{agree:>15.2%}"
+              f"{sum(t == OTHER_THEME for t in proto):>16}{proto_other:>15}{review_agree:>14.2%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Load test for the theme classification service (src/theme_service.py).
+
+Start the service first:
+    python -m src.theme_service
+Then:
+    python benchmarks/load_test_service.py --concurrency 32 --duration 20
+"""
+import os
+import json
+import time
+import argparse
+import threading
+import urllib.request
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_texts():
+    path = os.path.join(BASE_DIR, "data", "processed", "reviews_clean.csv")
+    if os.path.exists(path):
+        return pd.read_csv(path)['review_text'].astype(str).tolist()
+    return ["Refund not received after the order was cancelled."]
+
+def post_json(url, payload):
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+def get_json(url):
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.loads(response.read())
+
+def main():
+    parser = argparse.ArgumentParser(description="Theme service load test")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20, help="Seconds to run")
+    args = parser.parse_args()
+
+    texts = load_texts()
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + args.duration
+
+    def client(worker_id):
+        i = worker_id
+        local = []
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            try:
+                post_json(f"{args.url}/classify", {"text": texts[i % len(texts)]})
+                local.append((time.perf_counter() - start) * 1000)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+            i += args.concurrency
+        with lock:
+            latencies.extend(local)
+
+    print(f"Running {args.concurrency} concurrent clients for {args.duration}s against {args.url}...")
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(w,)) for w in range(args.concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    if not latencies:
+        print(f"No successful requests ({errors[0]} errors).")
+        return
+
+    latencies = np.array(latencies)
+    print("\nClient-side:")
+    print(f"  requests:   {len(latencies)} ok, {errors[0]} errors")
+    print(f"  throughput: {len(latencies) / elapsed:.1f} req/s")
+    print(f"  p50:        {np.percentile(latencies, 50):.2f} ms")
+    print(f"  p99:        {np.percentile(latencies, 99):.2f} ms")
+
+    print("\nServer-side (/stats):")
+    for key, value in get_json(f"{args.url}/stats").items():
+        print(f"  {key}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import pandas as pd
 import random
 import os
+import uuid
 import json
 from datetime import datetime, timedelta
 
@@ -73,7 +74,7 @@ def generate_mock_data(output_path):
         review_date = (start_date + timedelta(days=days_offset)).strftime("%Y-%m-%d %H:%M:%S")
         
         records.append({
-            "review_id": f"gp_mock_{i}",
+            "review_id": f"gp_mock_{uuid.uuid4()}",
             "rating": rating,
             "review_text": review_text,
             "date": review_date,
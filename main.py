@@ -1,9 +1,8 @@
 import os
 import json
-import pandas as pd
 from src.data_processor import load_and_validate, clean_reviews
 from src.analyzer import discover_themes, select_quotes
-from src.report_gen import generate_reports, generate_detailed_breakdown
+from src.report_gen import generate_reports, generate_detailed_breakdown, generate_multi_window_report
 
 def load_config():
     config_path = os.path.join(os.path.dirname(__file__), "config", "config.json")
@@ -18,7 +17,6 @@ def main():
     # Paths
     raw_path = "data/raw/shein_reviews_raw.csv"
     processed_path = "data/processed/reviews_clean.csv"
-    mapping_path = "data/processed/reviews_with_themes.csv"
     
     # 1. Ingestion & Validation
     df_raw = load_and_validate(raw_path)
@@ -27,17 +25,19 @@ def main():
     df_clean = clean_reviews(df_raw, processed_path)
     
     # 3. Theme Discovery (Two-Layer Product Taxonomy)
-    df_analyzed, themes, embeddings = discover_themes(df_clean)
+    df_analyzed, themes, embeddings, pool = discover_themes(df_clean)
     
     # 4. Quote Selection (Refined)
-    quotes = select_quotes(df_analyzed, themes)
+    quotes = select_quotes(df_analyzed, themes, pool=pool)
     
     # 5 & 6. Report Generation
     generate_reports(df_analyzed, themes, quotes)
     
-    # Detailed Theme Breakdown (PDF & MD)
-    df_mapping = pd.read_csv(mapping_path)
-    generate_detailed_breakdown(df_mapping, themes)
+    # 1/4/8-week views and week-over-week deltas from one aggregation pass
+    generate_multi_window_report(df_analyzed)
+    
+    # Detailed Theme Breakdown (PDF & MD), quotes and counts served from the pool
+    generate_detailed_breakdown(df_analyzed, themes, pool=pool)
     
     print("\nAll tasks completed successfully.")
 
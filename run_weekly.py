@@ -5,9 +5,7 @@ import logging
 import argparse
 import json
 from datetime import datetime
-import smtplib
-from email.message import EmailMessage
-from dotenv import load_dotenv
+from src.email_delivery import load_email_settings, deliver
 
 # =========================================================
 # Logging setup
@@ -34,56 +32,29 @@ logging.basicConfig(
 # Email helper (SIDE EFFECTS LIVE HERE)
 # =========================================================
 
-def send_email_with_attachment(subject, body, attachment_path):
-    load_dotenv()
-
-    email_host = os.getenv("EMAIL_HOST")
-    email_port = os.getenv("EMAIL_PORT")
-    email_user = os.getenv("EMAIL_USER")
-    email_password = os.getenv("EMAIL_PASSWORD")
-    email_to = os.getenv("EMAIL_TO")
-
-    if not all([email_host, email_port, email_user, email_password, email_to]):
-        logging.error("Email environment variables are not fully set. Skipping email.")
-        return
-
-    if not os.path.exists(attachment_path):
-        logging.error(f"Attachment not found at {attachment_path}. Email not sent.")
-        return
-
-    try:
-        email_port = int(email_port)
-    except ValueError:
-        logging.error("EMAIL_PORT is not a valid integer. Email not sent.")
-        return
-
-    msg = EmailMessage()
-    msg["Subject"] = subject
-    msg["From"] = email_user
-    msg["To"] = email_to
-    msg.set_content(body)
-
-    with open(attachment_path, "rb") as f:
-        file_data = f.read()
-        file_name = os.path.basename(attachment_path)
-
-    msg.add_attachment(
-        file_data,
-        maintype="application",
-        subtype="pdf",
-        filename=file_name,
+def send_email_with_attachment(subject, body, attachment_path, recipients=None):
+    """Send the report to every EMAIL_TO recipient over pooled SMTP connections."""
+    settings = load_email_settings()
+    if settings is None:
+        return None
+
+    jobs = [
+        {
+            "recipients": [recipient],
+            "subject": subject,
+            "body": body,
+            "attachment_path": attachment_path,
+        }
+        for recipient in (recipients or settings["recipients"])
+    ]
+    report_path = os.path.join(
+        LOG_DIR, f"delivery_report_{datetime.now().strftime('%Y%m%d')}.json"
     )
+    report = deliver(jobs, settings, report_path=report_path)
 
-    try:
-        with smtplib.SMTP(email_host, email_port) as server:
-            server.starttls()
-            server.login(email_user, email_password)
-            server.send_message(msg)
-
+    if report["failed"] == 0:
         logging.info("Weekly email sent successfully.")
-
-    except Exception as e:
-        logging.error(f"Failed to send email: {str(e)}")
+    return report
 
 # =========================================================
 # Script runner utility
@@ -2,26 +2,63 @@ import pandas as pd
 import numpy as np
 import os
 import json
-from sentence_transformers import SentenceTransformer
 from sklearn.cluster import KMeans
-from sklearn.feature_extraction.text import TfidfVectorizer
-from transformers import pipeline
+from sklearn.feature_extraction.text import CountVectorizer
+from scipy import sparse
+from src.clustering import reduce_embeddings, select_num_clusters, save_theme_model
+from src.emerging_detector import EmergingIssueDetector
+from src.model_registry import load_sentence_model, load_text_generator
+from src.quote_pool import QuotePool
+from src.review_index import ReviewIndex
+from src.taxonomy_prototypes import load_or_build_prototypes, cluster_centroids, map_to_prototypes
+
+def load_config():
+    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "config.json")
+    with open(config_path, "r") as f:
+        return json.load(f)
 
 def load_taxonomy():
     taxonomy_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "product_taxonomy.json")
     with open(taxonomy_path, "r") as f:
         return json.load(f)
 
-def map_cluster_to_taxonomy(cluster_reviews, taxonomy):
-    """Deterministic keyword-based mapping logic."""
-    # Extract top keywords/phrases from the cluster
-    vectorizer = TfidfVectorizer(stop_words='english', max_features=10, ngram_range=(1, 2))
+def extract_cluster_terms(texts, labels, num_clusters, top_n=10):
+    """Most frequent terms of every cluster from a single vectorizer fit.
+
+    Selects the same terms as fitting `TfidfVectorizer(max_features=top_n)` on each
+    cluster separately (max_features keeps the highest in-cluster term counts), but
+    tokenizes the corpus once: per-cluster counts are the rows of one sparse
+    indicator x count-matrix product. Terms are returned highest count first.
+    """
+    vectorizer = CountVectorizer(stop_words='english', ngram_range=(1, 2))
     try:
-        vectorizer.fit(cluster_reviews)
-        cluster_terms = vectorizer.get_feature_names_out()
-    except:
-        cluster_terms = []
+        counts = vectorizer.fit_transform(texts)
+    except ValueError as e:
+        # Only raised when the whole corpus has no usable (non stop-word) tokens
+        print(f"Warning: keyword extraction skipped. {e}")
+        return {i: [] for i in range(num_clusters)}
+
+    labels = np.asarray(labels)
+    indicator = sparse.csr_matrix(
+        (np.ones(len(labels), dtype=counts.dtype), (labels, np.arange(len(labels)))),
+        shape=(num_clusters, len(labels))
+    )
+    cluster_counts = (indicator @ counts).tocsr()
+    cluster_counts.eliminate_zeros()
+    # Alphabetical column order within each row, as a per-cluster vocabulary would have,
+    # so the argsort below breaks count ties exactly like max_features does
+    cluster_counts.sort_indices()
+    vocab = vectorizer.get_feature_names_out()
+
+    cluster_terms = {}
+    for i in range(num_clusters):
+        row = cluster_counts.getrow(i)
+        top = (-row.data).argsort()[:top_n]
+        cluster_terms[i] = [vocab[j] for j in row.indices[top]]
+    return cluster_terms
 
+def map_terms_to_taxonomy(cluster_terms, taxonomy):
+    """Deterministic keyword-based mapping logic."""
     best_theme = "Other / Emerging Issues"
     max_score = 0
     
@@ -47,12 +84,60 @@ def map_cluster_to_taxonomy(cluster_reviews, taxonomy):
          
     return best_theme
 
+def map_cluster_to_taxonomy(cluster_reviews, taxonomy):
+    """Map a single cluster's reviews to a taxonomy theme."""
+    cluster_reviews = list(cluster_reviews)
+    cluster_terms = extract_cluster_terms(cluster_reviews, np.zeros(len(cluster_reviews), dtype=int), 1)[0]
+    return map_terms_to_taxonomy(cluster_terms, taxonomy)
+
+def drill_down_other(df, embeddings, min_reviews=None, max_subclusters=None):
+    """Second-pass clustering of the "Other / Emerging Issues" bucket only.
+
+    Reuses the embeddings already computed for the main clustering and fits a
+    small-k KMeans on the Other rows alone, so the cost scales with the size of
+    the bucket rather than the full dataset. Each sub-group is labelled with its
+    most frequent terms.
+    """
+    config = load_config()
+    min_reviews = min_reviews or config.get("OTHER_MIN_REVIEWS", 10)
+    max_subclusters = max_subclusters or config.get("OTHER_MAX_SUBCLUSTERS", 5)
+
+    mask = (df['theme_name'] == "Other / Emerging Issues").values
+    n_other = int(mask.sum())
+    if n_other < min_reviews:
+        return []
+
+    print(f"Drilling down into {n_other} Other / Emerging Issues reviews...")
+    other_texts = df.loc[mask, 'review_text'].tolist()
+    other_embeddings = embeddings[mask]
+
+    # Small k that grows slowly with the bucket size
+    k = int(min(max_subclusters, max(2, round(np.sqrt(n_other / 5)))))
+    sub_labels = KMeans(n_clusters=k, random_state=42, n_init=3).fit_predict(other_embeddings)
+    sub_terms = extract_cluster_terms(other_texts, sub_labels, k, top_n=6)
+    for i, terms in sub_terms.items():
+        # "customer, service, customer service" -> "customer service, ..."
+        sub_terms[i] = [t for t in terms if not any(t != o and t in o.split() for o in terms)][:3]
+
+    subgroups = []
+    for i in range(k):
+        members = np.flatnonzero(sub_labels == i)
+        if len(members) == 0:
+            continue
+        subgroups.append({
+            "label": ", ".join(sub_terms[i]) or f"Sub-group {i + 1}",
+            "terms": sub_terms[i],
+            "count": int(len(members)),
+            "share": round(len(members) / n_other * 100, 1),
+            "examples": [other_texts[j] for j in members[:2]],
+        })
+    return sorted(subgroups, key=lambda g: g['count'], reverse=True)
+
 def get_llm_description(theme_name, samples):
     """Use LLM only for phrasing descriptions as per Objective 1."""
     try:
         print(f"Generating description for theme: {theme_name}")
-        model_name = "distilgpt2"
-        generator = pipeline("text-generation", model=model_name, device=-1)
+        generator = load_text_generator()
         
         text = " | ".join(samples[:3])
         prompt = f"Category: {theme_name}\nReviews: {text}\nSummary of issues: "
@@ -64,39 +149,73 @@ def get_llm_description(theme_name, samples):
         print(f"LLM Description failed: {e}")
         return None
 
-def discover_themes(df, num_themes=10): # We start with more clusters and then merge
+def discover_themes(df, num_themes=None): # We start with more clusters and then merge
     print(f"--- Task 3 (Product Taxonomy Update): Theme Discovery ---")
+    config = load_config()
+    num_themes = num_themes or config.get("NUM_THEMES", 10)
     
     processed_mapping_path = "data/processed/reviews_with_themes.csv"
     os.makedirs("data/processed", exist_ok=True)
     
     # 1. Generate Embeddings
     print("Generating embeddings using all-MiniLM-L6-v2...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
+    model = load_sentence_model()
     embeddings = model.encode(df['review_text'].tolist(), show_progress_bar=True)
     
-    # 2. Semantic Clustering (Deterministic step)
-    print(f"Clustering into {num_themes} semantic groups...")
+    # 2. Optional dimensionality reduction (fitted once, persisted in data/models)
+    cluster_input = reduce_embeddings(embeddings)
+    
+    if num_themes == "auto":
+        num_themes = select_num_clusters(cluster_input, strata=df['rating'].values)
+    
+    # 3. Semantic Clustering (Deterministic step)
+    print(f"Clustering into {num_themes} semantic groups ({cluster_input.shape[1]} dims)...")
     kmeans = KMeans(n_clusters=num_themes, random_state=42, n_init=10)
-    df['cluster_id'] = kmeans.fit_predict(embeddings)
+    df['cluster_id'] = kmeans.fit_predict(cluster_input)
     
     taxonomy = load_taxonomy()
     
-    # 3. Layer 2: Map to Taxonomy
+    # 4. Layer 2: Map to Taxonomy
     print("Mapping clusters to product taxonomy...")
-    cluster_to_theme = {}
-    for i in range(num_themes):
-        cluster_reviews = df[df['cluster_id'] == i]['review_text']
-        theme_name = map_cluster_to_taxonomy(cluster_reviews, taxonomy)
-        cluster_to_theme[i] = theme_name
+    mapping_mode = config.get("TAXONOMY_MAPPING", "hybrid")
+    cluster_terms = extract_cluster_terms(df['review_text'].tolist(), df['cluster_id'].values, num_themes)
+    cluster_to_theme = {
+        i: map_terms_to_taxonomy(cluster_terms[i], taxonomy) for i in range(num_themes)
+    }
+    
+    if mapping_mode in ("prototype", "hybrid"):
+        # Embedding-space mapping: one centroid x prototype cosine-similarity matmul
+        proto_names, prototypes = load_or_build_prototypes(model, taxonomy)
+        centroids = cluster_centroids(embeddings, df['cluster_id'].values, num_themes)
+        proto_themes, _ = map_to_prototypes(centroids, proto_names, prototypes)
+        for i in range(num_themes):
+            # hybrid keeps literal keyword hits and only rescues clusters that fell into Other
+            if mapping_mode == "prototype" or cluster_to_theme[i] == "Other / Emerging Issues":
+                cluster_to_theme[i] = proto_themes[i]
         
     df['theme_name'] = df['cluster_id'].map(cluster_to_theme)
+    save_theme_model(kmeans.cluster_centers_, cluster_to_theme, config.get("REDUCTION_METHOD", "none"))
     
-    # 4. Merge clusters by theme
+    # Re-seed the incremental emerging-issue detector against the new centroids
+    detector = EmergingIssueDetector.from_training(
+        cluster_input, df['cluster_id'].values, kmeans.cluster_centers_,
+        [cluster_to_theme[i] for i in range(num_themes)]
+    )
+    detector.save()
+    
+    has_review_ids = 'review_id' in df.columns
+    if not has_review_ids:
+        df['review_id'] = [f"rev_{i}" for i in range(len(df))]
+    
+    # 5. Merge clusters by theme
     themes_data = []
     final_theme_groups = df.groupby('theme_name')
+    # Reservoir-sampled quotes per theme / theme+rating, filled as each theme's reviews are collected
+    pool = QuotePool()
     
     for theme_name, group in final_theme_groups:
+        pool.add_frame(group)
+        
         # Get description
         taxonomy_info = taxonomy.get(theme_name, {"description": "Emerging issues or uncategorized feedback."})
         description = taxonomy_info["description"]
@@ -106,19 +225,20 @@ def discover_themes(df, num_themes=10): # We start with more clusters and then m
         # llm_desc = get_llm_description(theme_name, samples)
         # if llm_desc: description = llm_desc
 
-        themes_data.append({
+        theme_entry = {
             "theme_name": theme_name,
             "description": description,
             "count": len(group)
-        })
+        }
+        if theme_name == "Other / Emerging Issues":
+            theme_entry["subgroups"] = drill_down_other(df, embeddings)
+        themes_data.append(theme_entry)
         
     # Sort themes by volume
     themes_data = sorted(themes_data, key=lambda x: x['count'], reverse=True)
     
     # Objective 1: Persist mapping
     output_df = df.copy()
-    if 'review_id' not in output_df.columns:
-        output_df['review_id'] = [f"rev_{i}" for i in range(len(output_df))]
     
     # Ensure theme_id is consistent for this run (just use index in sorted themes)
     theme_id_map = {t['theme_name']: i for i, t in enumerate(themes_data)}
@@ -128,23 +248,33 @@ def discover_themes(df, num_themes=10): # We start with more clusters and then m
     output_df[cols_to_save].to_csv(processed_mapping_path, index=False)
     print(f"Saved review-to-theme mapping to {processed_mapping_path}")
     
-    return output_df, themes_data, embeddings
+    # Only reviews not indexed by an earlier run are appended to the similarity index;
+    # positional ids are not stable across runs, so those rows are keyed by content
+    ReviewIndex().add(embeddings, output_df, use_ids=has_review_ids)
+    
+    return output_df, themes_data, embeddings, pool
+
+def select_quotes(df, themes, pool=None):
+    """Pick 3 representative quotes per top theme.
 
-def select_quotes(df, themes):
+    With a QuotePool the quotes come straight from its per-theme reservoirs,
+    so the themed table does not need to be materialised or rescanned.
+    """
     print("--- Task 4 (Product Taxonomy Update): Quote Selection ---")
     selected_quotes = []
     
     for theme in themes[:5]: # Max 5 themes
         theme_name = theme['theme_name']
-        theme_reviews = df[df['theme_name'] == theme_name]
         
         # Get 3 representative reviews as per Objective 3
-        # Simplification: get the most "central" ones or just samples if embeddings not passed
-        # Here we just sample 3 and trim them
-        reps = theme_reviews.sample(min(len(theme_reviews), 3), random_state=42)
+        if pool is not None:
+            reps = pool.sample(theme_name, n=3)
+        else:
+            theme_reviews = df[df['theme_name'] == theme_name]
+            reps = theme_reviews.sample(min(len(theme_reviews), 3), random_state=42).to_dict('records')
         
         quotes_list = []
-        for _, row in reps.iterrows():
+        for row in reps:
             text = row['review_text']
             if len(text) > 200:
                 text = text[:197] + "..."
@@ -0,0 +1,185 @@
+import os
+import json
+import joblib
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans
+from sklearn.decomposition import PCA
+from sklearn.metrics import silhouette_score
+from sklearn.random_projection import GaussianRandomProjection
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "models")
+REDUCER_PATH = os.path.join(MODELS_DIR, "reducer.joblib")
+THEME_MODEL_PATH = os.path.join(MODELS_DIR, "theme_model.npz")
+
+REDUCTION_METHODS = ("none", "pca", "random_projection")
+
+def load_config():
+    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "config.json")
+    with open(config_path, "r") as f:
+        return json.load(f)
+
+def build_reducer(method, n_components):
+    """Create an unfitted reducer for the given method name."""
+    if method == "pca":
+        return PCA(n_components=n_components, random_state=42)
+    if method == "random_projection":
+        return GaussianRandomProjection(n_components=n_components, random_state=42)
+    raise ValueError(f"Unknown reduction method: {method}. Expected one of {REDUCTION_METHODS}")
+
+def load_or_fit_reducer(embeddings, method, n_components, path=REDUCER_PATH, refit=False):
+    """Load the persisted reducer if it matches the requested setup, otherwise fit and save one.
+
+    The embedding space is fixed by the sentence model, so a projection fitted on
+    one window stays valid for later windows and only needs to be fitted once.
+    """
+    input_dim = embeddings.shape[1]
+    n_components = min(n_components, input_dim, len(embeddings))
+
+    if not refit and os.path.exists(path):
+        try:
+            saved = joblib.load(path)
+            if (saved["method"] == method
+                    and saved["n_components"] == n_components
+                    and saved["input_dim"] == input_dim):
+                print(f"Loaded persisted {method} reducer from {path}")
+                return saved["reducer"]
+        except Exception as e:
+            print(f"Warning: could not load reducer from {path}, refitting. {e}")
+
+    print(f"Fitting {method} reducer ({input_dim} -> {n_components} dims)...")
+    reducer = build_reducer(method, n_components)
+    reducer.fit(embeddings)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump({
+        "method": method,
+        "n_components": n_components,
+        "input_dim": input_dim,
+        "reducer": reducer,
+    }, path)
+    print(f"Saved reducer to {path}")
+    return reducer
+
+def reduce_embeddings(embeddings, method=None, n_components=None, path=REDUCER_PATH):
+    """Project embeddings to the configured dimension before clustering.
+
+    Returns the input unchanged when reduction is disabled ("none").
+    """
+    config = load_config()
+    method = method or config.get("REDUCTION_METHOD", "none")
+    n_components = n_components or config.get("REDUCTION_DIM", 64)
+
+    if method == "none":
+        return embeddings
+
+    reducer = load_or_fit_reducer(embeddings, method, n_components, path=path)
+    reduced = reducer.transform(embeddings)
+    return np.ascontiguousarray(reduced, dtype=np.float32)
+
+def load_reducer(path=REDUCER_PATH):
+    """Load the persisted reducer without refitting. Returns None if there is none."""
+    if not os.path.exists(path):
+        return None
+    return joblib.load(path)["reducer"]
+
+def save_theme_model(centroids, cluster_to_theme, reduction_method, path=THEME_MODEL_PATH):
+    """Persist cluster centroids and their taxonomy themes so single reviews can be classified later."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    theme_names = [cluster_to_theme[i] for i in range(len(centroids))]
+    np.savez(
+        path,
+        centroids=np.asarray(centroids, dtype=np.float32),
+        theme_names=np.array(theme_names),
+        reduction_method=np.array(reduction_method),
+    )
+    print(f"Saved theme model to {path}")
+
+def load_theme_model(path=THEME_MODEL_PATH):
+    """Load centroids, per-cluster theme names and the reducer used to produce them."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Theme model not found at {path}. Run main.py first.")
+    data = np.load(path)
+    reduction_method = str(data["reduction_method"])
+    reducer = None if reduction_method == "none" else load_reducer()
+    return {
+        "centroids": data["centroids"],
+        "theme_names": [str(t) for t in data["theme_names"]],
+        "reducer": reducer,
+    }
+
+def stratified_sample(n_rows, strata=None, sample_size=2000, random_state=42):
+    """Return row indices for a sample that keeps the per-stratum proportions (e.g. rating)."""
+    if n_rows <= sample_size:
+        return np.arange(n_rows)
+
+    rng = np.random.default_rng(random_state)
+    if strata is None:
+        return np.sort(rng.choice(n_rows, size=sample_size, replace=False))
+
+    strata = np.asarray(strata)
+    picked = []
+    for value in np.unique(strata):
+        members = np.flatnonzero(strata == value)
+        take = max(1, int(round(sample_size * len(members) / n_rows)))
+        picked.append(rng.choice(members, size=min(take, len(members)), replace=False))
+    return np.sort(np.concatenate(picked))
+
+def _score_k(X, k, metric, random_state=42):
+    """Fit a cheap KMeans on the sample and score it."""
+    kmeans = KMeans(n_clusters=k, random_state=random_state, n_init=3)
+    labels = kmeans.fit_predict(X)
+    if metric == "silhouette":
+        return k, float(silhouette_score(X, labels, random_state=random_state)), kmeans.inertia_
+    return k, None, kmeans.inertia_
+
+def _elbow_k(ks, inertias):
+    """Pick the k furthest from the straight line between the first and last inertia points."""
+    ks = np.asarray(ks, dtype=float)
+    inertias = np.asarray(inertias, dtype=float)
+    if len(ks) < 3:
+        return int(ks[0])
+    x = (ks - ks[0]) / (ks[-1] - ks[0])
+    y = (inertias - inertias[-1]) / max(inertias[0] - inertias[-1], 1e-12)
+    # Distance to the line from (0, 1) to (1, 0)
+    distances = np.abs(x + y - 1) / np.sqrt(2)
+    return int(ks[int(np.argmax(distances))])
+
+def select_num_clusters(embeddings, strata=None, k_range=None, sample_size=None, n_jobs=None, metric=None):
+    """Sweep a k range in parallel on a stratified sample and return the best k.
+
+    Every candidate is fitted on the sample only (n_init=3), so the whole sweep
+    costs a fraction of a single full-data fit with n_init=10.
+    """
+    config = load_config()
+    k_min, k_max = k_range or config.get("K_RANGE", [4, 16])
+    sample_size = sample_size or config.get("K_SAMPLE_SIZE", 2000)
+    n_jobs = n_jobs or config.get("K_SELECTION_JOBS", -1)
+    metric = metric or config.get("K_SELECTION_METRIC", "silhouette")
+
+    idx = stratified_sample(len(embeddings), strata, sample_size)
+    X = embeddings[idx]
+    # Silhouette needs 2 <= k <= n - 1, so there is no k to compare below three rows
+    if len(X) < 3:
+        raise ValueError(
+            f"Cannot select the number of clusters from {len(X)} reviews (need at least 3). "
+            "Set NUM_THEMES to a number or provide more reviews."
+        )
+    k_max = min(k_max, len(X) - 1)
+    k_min = min(max(2, k_min), k_max)
+    ks = list(range(k_min, k_max + 1))
+
+    print(f"Selecting k in [{k_min}, {k_max}] on a {len(X)}-review sample ({metric})...")
+    results = Parallel(n_jobs=n_jobs)(delayed(_score_k)(X, k, metric) for k in ks)
+    results = sorted(results, key=lambda r: r[0])
+
+    if metric == "silhouette":
+        best_k = max(results, key=lambda r: r[1])[0]
+    else:
+        best_k = _elbow_k([r[0] for r in results], [r[2] for r in results])
+
+    for k, score, inertia in results:
+        marker = " <-" if k == best_k else ""
+        score_str = f"silhouette={score:.3f} " if score is not None else ""
+        print(f"  k={k:>2} {score_str}inertia={inertia:.1f}{marker}")
+    return best_k
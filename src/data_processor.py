@@ -5,6 +5,10 @@ import re
 import sys
 from datetime import datetime, timedelta
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.review_store import write_partitions, read_window, apply_retention, content_keys
+
 def load_config():
     config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "config.json")
     with open(config_path, "r") as f:
@@ -53,6 +57,17 @@ def clean_reviews(df, output_path):
     cutoff_date = reference_date - timedelta(weeks=weeks)
     df = df[df['date'] >= cutoff_date].copy()
     print(f"Filtered to reviews since {cutoff_date.date()}: {len(df)} remaining.")
+    # Raw-content key, so cleaned rows can be matched back to the raw review they came from
+    df['source_key'] = content_keys(df)
+    
+    # Reviews cleaned by earlier runs are read back from the processed store (window only);
+    # only reviews it has not seen yet are cleaned and written
+    app_id = df['app_id'].iloc[0] if 'app_id' in df.columns and len(df) else config.get("APP_PACKAGE_ID", "app")
+    stored = read_window("processed", app_id, cutoff_date)
+    if 'source_key' not in stored.columns:
+        stored = df.iloc[0:0].assign(dropped=False)
+    new = df[~df['source_key'].isin(set(stored['source_key']))].copy()
+    print(f"{len(df) - len(new)} reviews already in the processed store, cleaning the other {len(new)}.")
     
     # 2. PII and Noise Removal
     def remove_noise(text):
@@ -68,18 +83,24 @@ def clean_reviews(df, output_path):
         text = re.sub(r'\s+', ' ', text).strip()
         return text
 
-    df['review_text'] = df['review_text'].apply(remove_noise)
+    new['review_text'] = new['review_text'].apply(remove_noise)
     
     # 3. Basic cleanup
-    df['review_text'] = df['review_text'].str.strip()
+    new['review_text'] = new['review_text'].str.strip()
     
-    # 4. Drop very short reviews
-    df['word_count'] = df['review_text'].str.split().str.len()
-    df = df[df['word_count'] >= 5].copy()
-    print(f"Dropped short reviews (<5 words): {len(df)} remaining.")
+    # 4. Drop very short reviews (stored flagged as dropped, so later runs do not clean them again)
+    new['dropped'] = new['review_text'].str.split().str.len().fillna(0) < 5
+    
+    write_partitions(new, "processed", app_id)
+    apply_retention("processed", app_id)
     
-    # Final cleanup
-    df = df.drop(columns=['word_count'])
+    # Kept rows for exactly this run's input, in input order
+    cleaned = pd.concat([stored, new], ignore_index=True)
+    cleaned = cleaned[~cleaned['dropped'].fillna(False).astype(bool)]
+    columns = [c for c in df.columns if c != 'source_key']
+    df = df[['source_key']].merge(cleaned[['source_key'] + columns], on='source_key').drop(columns=['source_key'])
+    df['date'] = pd.to_datetime(df['date'])
+    print(f"Dropped short reviews (<5 words): {len(df)} remaining.")
     
     # Save to processed
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -0,0 +1,274 @@
+"""Pooled, concurrent SMTP delivery of the weekly reports.
+
+Authenticated connections are kept in a small pool and reused across messages,
+messages are sent with bounded parallelism, transient failures are retried with
+exponential backoff, and every run produces a delivery report.
+"""
+import os
+import json
+import time
+import queue
+import smtplib
+import logging
+import threading
+from datetime import datetime
+from email.message import EmailMessage
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+_ENV_LOADED = False
+
+def load_config():
+    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "config.json")
+    with open(config_path, "r") as f:
+        return json.load(f)
+
+def parse_recipients(value):
+    """Split a comma/semicolon separated recipient list."""
+    if not value:
+        return []
+    return [r.strip() for r in value.replace(";", ",").split(",") if r.strip()]
+
+def load_email_settings():
+    """Read SMTP settings from the environment (.env is loaded once per process)."""
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        load_dotenv()
+        _ENV_LOADED = True
+
+    config = load_config()
+    settings = {
+        "host": os.getenv("EMAIL_HOST"),
+        "port": os.getenv("EMAIL_PORT"),
+        "user": os.getenv("EMAIL_USER"),
+        "password": os.getenv("EMAIL_PASSWORD"),
+        "recipients": parse_recipients(os.getenv("EMAIL_TO")),
+        "starttls": os.getenv("EMAIL_STARTTLS", "true").lower() != "false",
+        "max_workers": config.get("EMAIL_MAX_WORKERS", 4),
+        "max_retries": config.get("EMAIL_MAX_RETRIES", 3),
+        "backoff_seconds": config.get("EMAIL_BACKOFF_SECONDS", 1.0),
+    }
+
+    if not all([settings["host"], settings["port"], settings["user"], settings["password"], settings["recipients"]]):
+        logging.error("Email environment variables are not fully set. Skipping email.")
+        return None
+    try:
+        settings["port"] = int(settings["port"])
+    except ValueError:
+        logging.error("EMAIL_PORT is not a valid integer. Email not sent.")
+        return None
+    return settings
+
+class SMTPConnectionPool:
+    """Up to `size` authenticated SMTP connections, reused across messages."""
+
+    def __init__(self, host, port, user=None, password=None, starttls=True, size=4, timeout=30):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.opened = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        server.ehlo()
+        if self.starttls:
+            server.starttls()
+            server.ehlo()
+        if self.user and self.password:
+            server.login(self.user, self.password)
+        with self._lock:
+            self.opened += 1
+        return server
+
+    def acquire(self):
+        self.slots.acquire()
+        try:
+            while True:
+                try:
+                    server = self.idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+                try:
+                    # Cheap liveness check so we never send on a connection the server dropped
+                    if server.noop()[0] == 250:
+                        return server
+                except smtplib.SMTPException:
+                    pass
+                except OSError:
+                    pass
+                self._close(server)
+        except Exception:
+            self.slots.release()
+            raise
+
+    def release(self, server, broken=False):
+        if broken:
+            self._close(server)
+        else:
+            self.idle.put(server)
+        self.slots.release()
+
+    def _close(self, server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def close_all(self):
+        while True:
+            try:
+                self._close(self.idle.get_nowait())
+            except queue.Empty:
+                break
+
+def build_message(sender, recipients, subject, body, attachment=None):
+    """attachment is an optional (file_name, bytes) tuple."""
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    msg["From"] = sender
+    msg["To"] = ", ".join(recipients)
+    msg.set_content(body)
+    if attachment is not None:
+        file_name, file_data = attachment
+        msg.add_attachment(
+            file_data,
+            maintype="application",
+            subtype="pdf",
+            filename=file_name,
+        )
+    return msg
+
+def _send_with_retry(pool, job, attachment, sender, max_retries, backoff_seconds):
+    result = {
+        "recipients": job["recipients"],
+        "subject": job["subject"],
+        "attachment": job.get("attachment_path"),
+        "status": "failed",
+        "attempts": 0,
+        "error": None,
+    }
+    start = time.perf_counter()
+    msg = build_message(sender, job["recipients"], job["subject"], job["body"], attachment)
+
+    for attempt in range(1, max_retries + 1):
+        result["attempts"] = attempt
+        server = None
+        try:
+            server = pool.acquire()
+            server.send_message(msg)
+            pool.release(server)
+            result["status"] = "sent"
+            result["error"] = None
+            break
+        except smtplib.SMTPRecipientsRefused as e:
+            pool.release(server)
+            result["error"] = f"Recipients refused: {e.recipients}"
+            # 5xx is permanent for these addresses; only 4xx is worth retrying
+            if all(code >= 500 for code, _ in e.recipients.values()):
+                break
+            if attempt < max_retries:
+                time.sleep(backoff_seconds * (2 ** (attempt - 1)))
+        except smtplib.SMTPResponseException as e:
+            # Sender refused, data rejected, authentication failed, ...: same 4xx/5xx rule
+            if server is not None:
+                pool.release(server, broken=True)
+            result["error"] = str(e)
+            if e.smtp_code >= 500:
+                break
+            if attempt < max_retries:
+                time.sleep(backoff_seconds * (2 ** (attempt - 1)))
+        except Exception as e:
+            if server is not None:
+                pool.release(server, broken=True)
+            result["error"] = str(e)
+            if attempt < max_retries:
+                time.sleep(backoff_seconds * (2 ** (attempt - 1)))
+
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+def deliver(jobs, settings, report_path=None):
+    """Send every job concurrently over pooled connections and return the delivery report.
+
+    Each job is a dict with recipients (list), subject, body and an optional
+    attachment_path. Attachments are read once per path, however many jobs share them.
+    """
+    attachments = {}
+    for job in jobs:
+        path = job.get("attachment_path")
+        if path and path not in attachments:
+            if not os.path.exists(path):
+                logging.error(f"Attachment not found at {path}. Email not sent.")
+                attachments[path] = None
+                continue
+            with open(path, "rb") as f:
+                attachments[path] = (os.path.basename(path), f.read())
+
+    sendable, skipped = [], []
+    for job in jobs:
+        if job.get("attachment_path") and attachments[job["attachment_path"]] is None:
+            skipped.append({
+                "recipients": job["recipients"],
+                "subject": job["subject"],
+                "attachment": job["attachment_path"],
+                "status": "failed",
+                "attempts": 0,
+                "error": "Attachment not found",
+                "elapsed_ms": 0.0,
+            })
+        else:
+            sendable.append(job)
+
+    pool = SMTPConnectionPool(
+        settings["host"], settings["port"], settings["user"], settings["password"],
+        starttls=settings["starttls"], size=settings["max_workers"],
+    )
+
+    started_at = datetime.now().isoformat(timespec="seconds")
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=settings["max_workers"]) as executor:
+            futures = [
+                executor.submit(
+                    _send_with_retry, pool, job, attachments.get(job.get("attachment_path")),
+                    settings["user"], settings["max_retries"], settings["backoff_seconds"],
+                )
+                for job in sendable
+            ]
+            results = [f.result() for f in futures] + skipped
+    finally:
+        pool.close_all()
+
+    sent = sum(1 for r in results if r["status"] == "sent")
+    report = {
+        "started_at": started_at,
+        "total": len(jobs),
+        "sent": sent,
+        "failed": len(jobs) - sent,
+        "connections_opened": pool.opened,
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+        "results": results,
+    }
+
+    if report_path:
+        os.makedirs(os.path.dirname(report_path), exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    logging.info(
+        f"Email delivery: {sent}/{len(jobs)} sent in {report['elapsed_seconds']}s "
+        f"over {pool.opened} connection(s)."
+    )
+    for r in results:
+        if r["status"] != "sent":
+            logging.error(f"Failed to send email to {r['recipients']}: {r['error']}")
+    return report
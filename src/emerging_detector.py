@@ -0,0 +1,234 @@
+"""Incremental emerging-issue detection between full re-clustering runs.
+
+Keeps running distance-to-nearest-centroid statistics per cluster (Welford).
+Reviews whose distance is an outlier for their nearest cluster are grouped
+online (leader clustering against a bounded set of groups), and an alert is
+raised once a group passes the volume threshold. Each review costs
+O(k + max_groups) regardless of how much history has been seen.
+
+    python -m src.emerging_detector data/raw/new_reviews.csv
+"""
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.clustering import MODELS_DIR
+
+DETECTOR_STATE_PATH = os.path.join(MODELS_DIR, "emerging_state.json")
+
+def load_config():
+    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "config.json")
+    with open(config_path, "r") as f:
+        return json.load(f)
+
+class EmergingIssueDetector:
+    def __init__(self, centroids, theme_names, z_threshold=None, group_similarity=None,
+                 alert_volume=None, max_groups=None, min_count=None):
+        config = load_config()
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.theme_names = list(theme_names)
+        self.z_threshold = z_threshold or config.get("EMERGING_Z_THRESHOLD", 3.0)
+        self.group_similarity = group_similarity or config.get("EMERGING_GROUP_SIMILARITY", 0.75)
+        self.alert_volume = alert_volume or config.get("EMERGING_ALERT_VOLUME", 15)
+        self.max_groups = max_groups or config.get("EMERGING_MAX_GROUPS", 50)
+        self.min_count = min_count or config.get("EMERGING_MIN_CLUSTER_COUNT", 20)
+
+        k = len(self.centroids)
+        self._centroid_sq = (self.centroids ** 2).sum(axis=1)
+        # Welford running statistics of distance to centroid, per cluster
+        self.counts = np.zeros(k, dtype=np.int64)
+        self.means = np.zeros(k, dtype=np.float64)
+        self.m2 = np.zeros(k, dtype=np.float64)
+
+        self.groups = []
+        self.alerts = []
+        self._next_group_id = 0
+        # mtime of the state file this detector was loaded from / last saved to
+        self._state_mtime = None
+
+    @classmethod
+    def from_training(cls, vectors, labels, centroids, theme_names, **kwargs):
+        """Seed the per-cluster distance statistics from the clustering run's own assignments."""
+        detector = cls(centroids, theme_names, **kwargs)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        labels = np.asarray(labels)
+        distances = np.linalg.norm(vectors - detector.centroids[labels], axis=1)
+        for c in range(len(detector.centroids)):
+            d = distances[labels == c]
+            if len(d) == 0:
+                continue
+            detector.counts[c] = len(d)
+            detector.means[c] = d.mean()
+            detector.m2[c] = ((d - d.mean()) ** 2).sum()
+        return detector
+
+    def _update_stats(self, c, distance):
+        self.counts[c] += 1
+        delta = distance - self.means[c]
+        self.means[c] += delta / self.counts[c]
+        self.m2[c] += delta * (distance - self.means[c])
+
+    def _std(self, c):
+        if self.counts[c] < 2:
+            return 0.0
+        return float(np.sqrt(self.m2[c] / (self.counts[c] - 1)))
+
+    def _assign_group(self, vector, text, timestamp):
+        unit = vector / max(np.linalg.norm(vector), 1e-12)
+        best, best_sim = None, -1.0
+        for group in self.groups:
+            sim = float(unit @ group["centroid"] / max(np.linalg.norm(group["centroid"]), 1e-12))
+            if sim > best_sim:
+                best, best_sim = group, sim
+
+        if best is not None and best_sim >= self.group_similarity:
+            best["count"] += 1
+            best["centroid"] += (unit - best["centroid"]) / best["count"]
+            best["last_seen"] = timestamp
+            if text and len(best["examples"]) < 3:
+                best["examples"].append(text[:200])
+            return best
+
+        if len(self.groups) >= self.max_groups:
+            # Keep memory and per-review cost bounded: drop the weakest non-alerted group
+            candidates = [g for g in self.groups if not g["alerted"]] or self.groups
+            weakest = min(candidates, key=lambda g: (g["count"], g["last_seen"]))
+            self.groups.remove(weakest)
+
+        group = {
+            "group_id": self._next_group_id,
+            "centroid": unit.copy(),
+            "count": 1,
+            "first_seen": timestamp,
+            "last_seen": timestamp,
+            "examples": [text[:200]] if text else [],
+            "alerted": False,
+        }
+        self._next_group_id += 1
+        self.groups.append(group)
+        return group
+
+    def observe(self, vector, text=None, timestamp=None):
+        """Score one review vector (in the clustering space) and update the detector state."""
+        vector = np.asarray(vector, dtype=np.float32)
+        timestamp = timestamp or datetime.now().isoformat(timespec="seconds")
+
+        sq = float(vector @ vector) - 2 * (self.centroids @ vector) + self._centroid_sq
+        c = int(sq.argmin())
+        distance = float(np.sqrt(max(sq[c], 0.0)))
+
+        std = self._std(c)
+        is_outlier = (
+            self.counts[c] >= self.min_count
+            and std > 0
+            and (distance - self.means[c]) / std > self.z_threshold
+        )
+
+        result = {
+            "cluster_id": c,
+            "theme_name": self.theme_names[c],
+            "distance": round(distance, 4),
+            "is_outlier": bool(is_outlier),
+            "group_id": None,
+            "alert": None,
+        }
+
+        if not is_outlier:
+            # Outliers are kept out of the statistics so they cannot mask themselves
+            self._update_stats(c, distance)
+            return result
+
+        group = self._assign_group(vector, text, timestamp)
+        result["group_id"] = group["group_id"]
+        if not group["alerted"] and group["count"] >= self.alert_volume:
+            group["alerted"] = True
+            alert = {
+                "group_id": group["group_id"],
+                "count": group["count"],
+                "nearest_theme": self.theme_names[c],
+                "first_seen": group["first_seen"],
+                "raised_at": timestamp,
+                "examples": list(group["examples"]),
+            }
+            self.alerts.append(alert)
+            result["alert"] = alert
+            print(f"ALERT: emerging issue group {group['group_id']} reached {group['count']} reviews "
+                  f"(nearest theme: {self.theme_names[c]})")
+        return result
+
+    def save(self, path=DETECTOR_STATE_PATH):
+        state = {
+            "centroids": self.centroids.tolist(),
+            "theme_names": self.theme_names,
+            "counts": self.counts.tolist(),
+            "means": self.means.tolist(),
+            "m2": self.m2.tolist(),
+            "groups": [dict(g, centroid=g["centroid"].tolist()) for g in self.groups],
+            "alerts": self.alerts,
+            "next_group_id": self._next_group_id,
+        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        self._state_mtime = os.stat(path).st_mtime_ns
+
+    def save_if_unchanged(self, path=DETECTOR_STATE_PATH):
+        """Save, unless the state on disk changed since it was loaded (e.g. a pipeline run re-seeded it)."""
+        on_disk = os.stat(path).st_mtime_ns if os.path.exists(path) else None
+        if on_disk != self._state_mtime:
+            print(f"Detector state at {path} changed since it was loaded; not overwriting it.")
+            return False
+        self.save(path)
+        return True
+
+    @classmethod
+    def load(cls, path=DETECTOR_STATE_PATH, **kwargs):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Detector state not found at {path}. Run main.py first.")
+        mtime = os.stat(path).st_mtime_ns
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        detector = cls(state["centroids"], state["theme_names"], **kwargs)
+        detector.counts = np.array(state["counts"], dtype=np.int64)
+        detector.means = np.array(state["means"], dtype=np.float64)
+        detector.m2 = np.array(state["m2"], dtype=np.float64)
+        detector.groups = [dict(g, centroid=np.array(g["centroid"], dtype=np.float32)) for g in state["groups"]]
+        detector.alerts = state["alerts"]
+        detector._next_group_id = state["next_group_id"]
+        detector._state_mtime = mtime
+        return detector
+
+def main():
+    import pandas as pd
+    from src.clustering import load_theme_model
+    from src.model_registry import load_sentence_model
+
+    parser = argparse.ArgumentParser(description="Feed new reviews through the emerging-issue detector")
+    parser.add_argument("csv_path", help="CSV with a review_text column (and optionally date)")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv_path)
+    detector = EmergingIssueDetector.load()
+    reducer = load_theme_model()["reducer"]
+
+    model = load_sentence_model()
+    vectors = model.encode(df['review_text'].astype(str).tolist(), show_progress_bar=True)
+    if reducer is not None:
+        vectors = reducer.transform(vectors)
+
+    dates = df['date'].astype(str).tolist() if 'date' in df.columns else [None] * len(df)
+    outliers = 0
+    for vector, text, date in zip(vectors, df['review_text'].astype(str), dates):
+        outliers += detector.observe(vector, text=text, timestamp=date)["is_outlier"]
+
+    detector.save_if_unchanged()
+    print(f"Processed {len(df)} reviews: {outliers} outliers, {len(detector.groups)} open groups, "
+          f"{len(detector.alerts)} alerts total.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""Local model registry: pinned model snapshots, offline loading, memory-mapped weights.
+
+Models are pinned once (online) into MODEL_DIR/<name>/ as a safetensors snapshot
+plus a manifest. Afterwards every load resolves the local directory only, with
+the Hugging Face hub forced offline. The network is built from its config with
+parameters on the `meta` device (nothing allocated) and then given tensors that
+are views of the memory-mapped `model.safetensors`, so the weights are never
+read into private memory: concurrent worker processes share the same physical
+pages of the page cache.
+
+Pinned embedding models are served by `MmapSentenceEncoder`, which runs the
+snapshot's Transformer -> Pooling -> Normalize modules itself, since
+SentenceTransformer always loads (copies) the weights while it is constructed.
+
+    python -m src.model_registry pin            # pin every model in MODEL_REGISTRY
+    python -m src.model_registry list
+"""
+import os
+import sys
+import json
+import argparse
+import hashlib
+from contextlib import contextmanager
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+WEIGHTS_FILE = "model.safetensors"
+MANIFEST_FILE = "registry_manifest.json"
+
+DEFAULT_REGISTRY = {
+    "embedding": {"repo_id": "sentence-transformers/all-MiniLM-L6-v2", "revision": "main", "kind": "sentence-transformer"},
+    "description_llm": {"repo_id": "distilgpt2", "revision": "main", "kind": "text-generation"},
+}
+
+def load_config():
+    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "config.json")
+    with open(config_path, "r") as f:
+        return json.load(f)
+
+def registry_dir():
+    return os.path.join(BASE_DIR, load_config().get("MODEL_DIR", os.path.join("data", "models", "registry")))
+
+def registry_entries():
+    return load_config().get("MODEL_REGISTRY", DEFAULT_REGISTRY)
+
+def model_path(name):
+    return os.path.join(registry_dir(), name)
+
+def is_pinned(name):
+    return os.path.exists(os.path.join(model_path(name), MANIFEST_FILE))
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _force_offline():
+    os.environ["HF_HUB_OFFLINE"] = "1"
+    os.environ["TRANSFORMERS_OFFLINE"] = "1"
+
+# safetensors dtype -> (numpy dtype of the raw bytes, torch dtype to view them as)
+_SAFETENSORS_DTYPES = {
+    "F64": ("float64", "float64"), "F32": ("float32", "float32"), "F16": ("float16", "float16"),
+    "BF16": ("uint16", "bfloat16"), "I64": ("int64", "int64"), "I32": ("int32", "int32"),
+    "I16": ("int16", "int16"), "I8": ("int8", "int8"), "U8": ("uint8", "uint8"), "BOOL": ("bool", "bool"),
+}
+
+def _mmap_safetensors(weights_path):
+    """Tensors of a safetensors file as zero-copy views of one copy-on-write memory map."""
+    import struct
+    import numpy as np
+    import torch
+
+    with open(weights_path, "rb") as f:
+        header_size = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(header_size))
+    data = np.memmap(weights_path, dtype=np.uint8, mode="c", offset=8 + header_size)
+    tensors = {}
+    for key, info in header.items():
+        if key == "__metadata__":
+            continue
+        np_dtype, torch_dtype = _SAFETENSORS_DTYPES[info["dtype"]]
+        start, end = info["data_offsets"]
+        raw = torch.from_numpy(data[start:end].view(np_dtype))
+        tensors[key] = raw.view(getattr(torch, torch_dtype)).reshape(info["shape"])
+    return tensors
+
+@contextmanager
+def _meta_parameters():
+    """Create every nn.Parameter on the meta device; buffers stay real (they are not all saved)."""
+    import torch
+
+    register = torch.nn.Module.register_parameter
+
+    def register_on_meta(module, name, param):
+        register(module, name, param)
+        if param is not None:
+            module._parameters[name] = type(param)(param.to("meta"), requires_grad=param.requires_grad)
+
+    torch.nn.Module.register_parameter = register_on_meta
+    try:
+        yield
+    finally:
+        torch.nn.Module.register_parameter = register
+
+def _load_mmap(model_cls, path):
+    """A transformers model built from its config, parameters assigned from the mmap'd weights."""
+    from transformers import AutoConfig
+
+    with _meta_parameters():
+        model = model_cls.from_config(AutoConfig.from_pretrained(path))
+    state_dict = _mmap_safetensors(os.path.join(path, WEIGHTS_FILE))
+    expected = model.state_dict().keys()
+    # Checkpoints are saved either with or without the base model prefix (e.g. "transformer.")
+    prefix = model.base_model_prefix + "."
+    if not any(key in expected for key in state_dict):
+        if any(key.startswith(prefix) for key in state_dict):
+            state_dict = {key[len(prefix):]: t for key, t in state_dict.items() if key.startswith(prefix)}
+        else:
+            state_dict = {prefix + key: t for key, t in state_dict.items()}
+    # assign=True keeps the mmap-backed tensors as the parameters instead of copying into them
+    model.load_state_dict(state_dict, strict=False, assign=True)
+    model.tie_weights()
+    missing = [n for n, p in model.named_parameters() if p.is_meta]
+    if missing:
+        raise ValueError(f"{os.path.join(path, WEIGHTS_FILE)} has no weights for {missing[:5]}")
+    return model.eval()
+
+class MmapSentenceEncoder:
+    """Sentence embeddings from a pinned sentence-transformers snapshot, weights memory-mapped.
+
+    Supports the Transformer -> Pooling (mean / cls / max) -> optional Normalize
+    pipeline of the snapshot's modules.json, and the `encode` arguments used here.
+    """
+
+    def __init__(self, path):
+        from transformers import AutoModel, AutoTokenizer
+
+        with open(os.path.join(path, "modules.json"), "r", encoding="utf-8") as f:
+            modules = json.load(f)
+        pooling_dir = next(m["path"] for m in modules if m["type"].endswith("Pooling"))
+        with open(os.path.join(path, pooling_dir, "config.json"), "r", encoding="utf-8") as f:
+            pooling = json.load(f)
+        # sentence-transformers >= 6 writes "pooling_mode", older versions one flag per mode
+        self.pooling_mode = pooling.get("pooling_mode") or (
+            "cls" if pooling.get("pooling_mode_cls_token")
+            else "max" if pooling.get("pooling_mode_max_tokens")
+            else "mean"
+        )
+        if self.pooling_mode not in ("mean", "cls", "max"):
+            raise ValueError(f"Unsupported pooling mode: {self.pooling_mode}")
+        self.normalize = any(m["type"].endswith("Normalize") for m in modules)
+
+        bert_config_path = os.path.join(path, "sentence_bert_config.json")
+        bert_config = {}
+        if os.path.exists(bert_config_path):
+            with open(bert_config_path, "r", encoding="utf-8") as f:
+                bert_config = json.load(f)
+        self.tokenizer = AutoTokenizer.from_pretrained(path)
+        self.max_seq_length = bert_config.get("max_seq_length") or self.tokenizer.model_max_length
+        self.do_lower_case = bert_config.get("do_lower_case", False)
+        self.model = _load_mmap(AutoModel, path)
+
+    def _pool(self, token_embeddings, attention_mask):
+        import torch
+
+        if self.pooling_mode == "cls":
+            return token_embeddings[:, 0]
+        mask = attention_mask.unsqueeze(-1).to(token_embeddings.dtype)
+        if self.pooling_mode == "max":
+            return token_embeddings.masked_fill(mask == 0, torch.finfo(token_embeddings.dtype).min).max(dim=1).values
+        return (token_embeddings * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False, **kwargs):
+        import numpy as np
+        import torch
+
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+        if self.do_lower_case:
+            sentences = [s.lower() for s in sentences]
+        batches = range(0, len(sentences), batch_size)
+        if show_progress_bar:
+            from tqdm.auto import tqdm
+            batches = tqdm(batches, desc="Batches")
+
+        out = []
+        with torch.inference_mode():
+            for start in batches:
+                features = self.tokenizer(sentences[start:start + batch_size], padding=True, truncation=True,
+                                          max_length=self.max_seq_length, return_tensors="pt")
+                embeddings = self._pool(self.model(**features).last_hidden_state, features["attention_mask"])
+                if self.normalize:
+                    embeddings = torch.nn.functional.normalize(embeddings, p=2, dim=1)
+                out.append(embeddings.float().numpy())
+        dim = self.model.config.hidden_size
+        embeddings = np.concatenate(out) if out else np.zeros((0, dim), dtype=np.float32)
+        return embeddings[0] if single else embeddings
+
+def _build(kind, path, mmap=True):
+    if kind == "sentence-transformer":
+        if mmap:
+            return MmapSentenceEncoder(path)
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(path, device="cpu")
+    if kind == "text-generation":
+        from transformers import pipeline
+        if mmap:
+            from transformers import AutoModelForCausalLM, AutoTokenizer
+            return pipeline("text-generation", model=_load_mmap(AutoModelForCausalLM, path),
+                            tokenizer=AutoTokenizer.from_pretrained(path), device=-1)
+        return pipeline("text-generation", model=path, device=-1)
+    raise ValueError(f"Unknown model kind: {kind}")
+
+def pin_model(name):
+    """Download a model's safetensors snapshot into the registry. Needs network."""
+    from huggingface_hub import snapshot_download
+
+    entry = registry_entries()[name]
+    path = model_path(name)
+    print(f"Pinning {name}: {entry['repo_id']}@{entry.get('revision', 'main')} -> {path}")
+    # Only the safetensors weights: no duplicate pytorch/tf/flax/onnx/openvino exports on disk
+    snapshot_download(repo_id=entry["repo_id"], revision=entry.get("revision", "main"), local_dir=path,
+                      ignore_patterns=["*.bin", "*.h5", "*.msgpack", "*.ot", "*.onnx", "onnx/*", "openvino/*"])
+    if not os.path.exists(os.path.join(path, WEIGHTS_FILE)):
+        raise FileNotFoundError(f"{entry['repo_id']} has no {WEIGHTS_FILE}; only safetensors snapshots can be pinned")
+
+    manifest = {
+        "name": name,
+        "repo_id": entry["repo_id"],
+        "revision": entry.get("revision", "main"),
+        "kind": entry["kind"],
+        "pinned_at": datetime.now().isoformat(timespec="seconds"),
+        "files": {
+            os.path.relpath(os.path.join(root, f), path): _sha256(os.path.join(root, f))
+            for root, _, files in os.walk(path)
+            for f in files
+            if f != MANIFEST_FILE and ".cache" not in root
+        },
+    }
+    with open(os.path.join(path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Pinned {name} ({len(manifest['files'])} files)")
+    return manifest
+
+def load_model(name, mmap=True):
+    """Load a pinned model fully offline, with weights memory-mapped from the registry.
+
+    mmap=False loads it the regular way (SentenceTransformer / pipeline by path).
+    """
+    if not is_pinned(name):
+        raise FileNotFoundError(
+            f"Model '{name}' is not pinned in {registry_dir()}. Run: python -m src.model_registry pin {name}"
+        )
+    _force_offline()
+    path = model_path(name)
+    with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        kind = json.load(f)["kind"]
+
+    return _build(kind, path, mmap)
+
+def load_sentence_model():
+    """The embedding model used for clustering, from the registry when pinned."""
+    if is_pinned("embedding"):
+        return load_model("embedding")
+    from sentence_transformers import SentenceTransformer
+    print("Warning: embedding model not pinned in the registry, resolving all-MiniLM-L6-v2 by name.")
+    return SentenceTransformer('all-MiniLM-L6-v2')
+
+def load_text_generator():
+    if is_pinned("description_llm"):
+        return load_model("description_llm")
+    from transformers import pipeline
+    return pipeline("text-generation", model="distilgpt2", device=-1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Local model registry")
+    sub = parser.add_subparsers(dest="command", required=True)
+    pin = sub.add_parser("pin", help="Download and pin models (needs network)")
+    pin.add_argument("names", nargs="*", help="Registry names; defaults to all")
+    sub.add_parser("list", help="Show registry entries and whether they are pinned")
+    args = parser.parse_args()
+
+    if args.command == "pin":
+        for name in args.names or list(registry_entries()):
+            pin_model(name)
+    else:
+        for name, entry in registry_entries().items():
+            status = "pinned" if is_pinned(name) else "not pinned"
+            print(f"{name:<16} {entry['repo_id']}@{entry.get('revision', 'main'):<10} {status}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Per-theme reservoir samples of representative reviews.
+
+Reviews are offered to the pool one at a time as they are classified, so quote
+selection never needs the full themed table in memory or a second scan. Each
+theme (and each theme/rating pair) keeps a fixed-size reservoir (Algorithm R)
+driven by its own seeded RNG, so the same input order always yields the same quotes.
+"""
+import os
+import json
+import random
+
+QUOTE_POOL_PATH = "data/processed/quote_pool.json"
+
+def load_config():
+    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "config.json")
+    with open(config_path, "r") as f:
+        return json.load(f)
+
+class _Reservoir:
+    __slots__ = ("size", "seen", "items", "rng")
+
+    def __init__(self, size, seed):
+        self.size = size
+        self.seen = 0
+        self.items = []
+        self.rng = random.Random(seed)
+
+    def offer(self, item):
+        self.seen += 1
+        if len(self.items) < self.size:
+            self.items.append(item)
+            return
+        j = self.rng.randrange(self.seen)
+        if j < self.size:
+            self.items[j] = item
+
+    def to_dict(self):
+        version, internal, gauss_next = self.rng.getstate()
+        return {"seen": self.seen, "items": self.items, "rng": [version, list(internal), gauss_next]}
+
+    def restore(self, data):
+        self.seen = data["seen"]
+        self.items = data["items"]
+        version, internal, gauss_next = data["rng"]
+        self.rng.setstate((version, tuple(internal), gauss_next))
+
+class QuotePool:
+    def __init__(self, size=None, seed=42):
+        self.size = size or load_config().get("QUOTE_POOL_SIZE", 3)
+        self.seed = seed
+        self.themes = {}
+        self.by_rating = {}
+
+    def _reservoir(self, store, key):
+        if key not in store:
+            store[key] = _Reservoir(self.size, f"{self.seed}:{key}")
+        return store[key]
+
+    def add(self, theme_name, rating, review_text, review_id=None, date=None):
+        """O(1) update for one classified review."""
+        item = {
+            "review_id": review_id,
+            "rating": int(rating),
+            "review_text": review_text,
+            "date": str(date) if date is not None else None,
+        }
+        self._reservoir(self.themes, theme_name).offer(item)
+        self._reservoir(self.by_rating, (theme_name, int(rating))).offer(item)
+
+    def add_frame(self, df):
+        """Offer a (chunk of a) themed DataFrame, row by row."""
+        has_id = 'review_id' in df.columns
+        for row in df.itertuples(index=False):
+            self.add(
+                row.theme_name, row.rating, row.review_text,
+                review_id=row.review_id if has_id else None, date=row.date
+            )
+
+    def sample(self, theme_name, rating=None, n=None):
+        store, key = (self.themes, theme_name) if rating is None else (self.by_rating, (theme_name, int(rating)))
+        reservoir = store.get(key)
+        if reservoir is None:
+            return []
+        return list(reservoir.items[:n or self.size])
+
+    def count(self, theme_name, rating=None):
+        """Number of reviews seen for a theme (or theme/rating), for free alongside the samples."""
+        store, key = (self.themes, theme_name) if rating is None else (self.by_rating, (theme_name, int(rating)))
+        reservoir = store.get(key)
+        return reservoir.seen if reservoir else 0
+
+    def total(self):
+        return sum(r.seen for r in self.themes.values())
+
+    def rating_counts(self):
+        """{rating: reviews seen} across all themes."""
+        counts = {}
+        for (_, rating), r in self.by_rating.items():
+            counts[rating] = counts.get(rating, 0) + r.seen
+        return counts
+
+    def save(self, path=QUOTE_POOL_PATH):
+        # RNG state is saved too, so a reloaded pool keeps sampling exactly where it left off
+        state = {
+            "size": self.size,
+            "seed": self.seed,
+            "themes": {k: r.to_dict() for k, r in self.themes.items()},
+            "by_rating": [
+                dict(r.to_dict(), theme=k[0], rating=k[1]) for k, r in self.by_rating.items()
+            ],
+        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        print(f"Saved quote pools to {path}")
+
+    @classmethod
+    def load(cls, path=QUOTE_POOL_PATH):
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        pool = cls(size=state["size"], seed=state["seed"])
+        for theme_name, r in state["themes"].items():
+            pool._reservoir(pool.themes, theme_name).restore(r)
+        for r in state["by_rating"]:
+            pool._reservoir(pool.by_rating, (r["theme"], r["rating"])).restore(r)
+        return pool
@@ -2,7 +2,9 @@ import os
 import json
 import pandas as pd
 from datetime import datetime, timedelta
-from fpdf import FPDF
+from src.report_render import (
+    render_weekly_note, render_email, render_breakdown_markdown, render_breakdown_pdf
+)
 
 ACTION_TEMPLATES = {
     "Payments & Refunds": "Improve refund transparency by surfacing real-time refund status and reducing turnaround time for wrong-item cases.",
@@ -19,196 +21,219 @@ def load_config():
     with open(config_path, "r") as f:
         return json.load(f)
 
+def rating_distribution_from_counts(counts):
+    """Rounded whole-% split of 1-2★ / 3★ / 4-5★ from a {rating: count} mapping."""
+    total = sum(counts.values())
+    if total == 0:
+        return {"1-2": 0, "3": 0, "4-5": 0}
+    return {
+        "1-2": round((sum(c for r, c in counts.items() if r <= 2) / total) * 100),
+        "3": round((sum(c for r, c in counts.items() if r == 3) / total) * 100),
+        "4-5": round((sum(c for r, c in counts.items() if r >= 4) / total) * 100)
+    }
+
+def rating_distribution(df):
+    """Rounded whole-% split of 1-2★ / 3★ / 4-5★ reviews."""
+    return rating_distribution_from_counts(df['rating'].value_counts().to_dict())
+
+def build_pulse_document(df, themes, quotes, app_name):
+    """Document model shared by the weekly note and the email draft."""
+    dates = pd.to_datetime(df['date'])
+    return {
+        "app_name": app_name,
+        "start_date": dates.min().strftime("%b %d, %Y"),
+        "end_date": dates.max().strftime("%b %d, %Y"),
+        "week_str": dates.max().strftime("%d %b %Y"),
+        "dist": rating_distribution(df),
+        "top_themes": [
+            {
+                "theme_name": t['theme_name'],
+                "count": t['count'],
+                "action": ACTION_TEMPLATES.get(t['theme_name'])
+            }
+            for t in themes[:3]
+        ],
+        "quotes": quotes[:3],
+    }
+
 def generate_reports(df, themes, quotes):
     print("--- Task 5 & 6 (Upgraded): Report Generation ---")
     config = load_config()
     app_name = config.get("APP_NAME", "App")
     
-    # 1. Prepare data
-    start_date = pd.to_datetime(df['date']).min().strftime("%b %d, %Y")
-    end_date = pd.to_datetime(df['date']).max().strftime("%b %d, %Y")
-    week_str = pd.to_datetime(df['date']).max().strftime("%d %b %Y")
-    
-    # Rating Distribution (Objective 6)
-    total = len(df)
-    low_stars = len(df[df['rating'] <= 2])
-    mid_stars = len(df[df['rating'] == 3])
-    high_stars = len(df[df['rating'] >= 4])
+    doc = build_pulse_document(df, themes, quotes, app_name)
     
-    dist = {
-        "1-2": round((low_stars / total) * 100),
-        "3": round((mid_stars / total) * 100),
-        "4-5": round((high_stars / total) * 100)
-    }
-
     # Task 5: Weekly Insight Note
-    note_content = f"# {app_name} — Weekly App Review Pulse\n"
-    note_content += f"Period: {start_date} - {end_date}\n\n"
-    note_content += "## Top Themes\n"
-    for i, t in enumerate(themes[:3], 1):
-        note_content += f"{i}. {t['theme_name']}: {t['count']} reviews\n"
-    
-    note_content += "\n## What Users Are Saying\n"
-    for t_quote in quotes[:3]:
-        for q in t_quote['quotes']:
-             note_content += f"• [{t_quote['theme']}] \"{q['quote']}\"\n"
-        
-    note_content += "\n## Action Ideas\n"
-    for i, t in enumerate(themes[:3], 1):
-        action = ACTION_TEMPLATES.get(t['theme_name'], "Investigate user concerns.")
-        note_content += f"{i}. {action}\n"
-    
     os.makedirs("outputs", exist_ok=True)
     with open("outputs/weekly_note.md", "w", encoding='utf-8') as f:
-        f.write(note_content.strip())
+        f.write(render_weekly_note(doc))
     print("Saved weekly_note.md")
 
     # Task 6: Email Draft (Updated Objective 6)
-    email_content = f"Subject: {app_name} — Weekly App Review Pulse ({week_str})\n\n"
-    email_content += "Hi team,\n\n"
-    email_content += f"Recent feedback for {app_name} highlights {themes[0]['theme_name']} and {themes[1]['theme_name']} as key focus areas.\n\n"
-    
-    email_content += "## Top Themes\n"
-    for t in themes[:3]:
-        email_content += f"- {t['theme_name']} ({t['count']} reviews)\n"
-    
-    email_content += "\n## Rating Distribution (This Period)\n"
-    email_content += f"- 1–2★: {dist['1-2']}%\n"
-    email_content += f"- 3★: {dist['3']}%\n"
-    email_content += f"- 4–5★: {dist['4-5']}%\n\n"
-    
-    email_content += "## Action Ideas\n"
-    for t in themes[:3]:
-        action = ACTION_TEMPLATES.get(t['theme_name'], "Analyze emerging issues.")
-        email_content += f"- {action}\n"
-        
-    email_content += "\nBest,\nProduct Manager"
-    
     with open("outputs/email_draft.txt", "w", encoding='utf-8') as f:
-        f.write(email_content.strip())
+        f.write(render_email(doc))
     print("Saved email_draft.txt")
 
-def generate_detailed_breakdown(df_mapping, themes):
+def build_weekly_aggregates(df):
+    """Single pass over the themed data: review counts per (trailing week, theme, rating), and the end date.
+
+    Weeks are 7-day spans counted back from the latest review (`weeks_ago` 0 is the
+    most recent seven days), so the newest bucket is always a full week rather
+    than the partial calendar week the job happens to run in.
+    """
+    dates = pd.to_datetime(df['date'])
+    end = dates.max()
+    weeks_ago = ((end - dates) // pd.Timedelta(weeks=1)).astype(int)
+    weekly = (
+        df.assign(weeks_ago=weeks_ago)
+        .groupby(['weeks_ago', 'theme_name', 'rating'])
+        .size()
+        .rename('count')
+        .reset_index()
+    )
+    return weekly, end
+
+def summarize_windows(weekly, windows, end):
+    """Theme counts, shares and rating mix for each trailing window, plus week-over-week deltas.
+
+    Works only on the pre-aggregated weekly table, so every extra window is a
+    cheap aggregation rather than another pipeline run.
+    """
+    summaries = {}
+    for weeks in windows:
+        window = weekly[weekly['weeks_ago'] < weeks]
+        total = int(window['count'].sum())
+        by_theme = window.groupby('theme_name')['count'].sum().sort_values(ascending=False)
+        by_rating = window.groupby('rating')['count'].sum()
+        summaries[weeks] = {
+            "start": end - pd.Timedelta(weeks=weeks),
+            "total": total,
+            "themes": by_theme.to_dict(),
+            "dist": {
+                "1-2": round(by_rating[by_rating.index <= 2].sum() / total * 100) if total else 0,
+                "3": round(by_rating[by_rating.index == 3].sum() / total * 100) if total else 0,
+                "4-5": round(by_rating[by_rating.index >= 4].sum() / total * 100) if total else 0,
+            },
+        }
+
+    per_week = weekly.pivot_table(index='theme_name', columns='weeks_ago', values='count',
+                                  aggfunc='sum', fill_value=0)
+    this_counts = per_week[0] if 0 in per_week.columns else pd.Series(0, index=per_week.index)
+    prev_counts = per_week[1] if 1 in per_week.columns else pd.Series(0, index=per_week.index)
+    deltas = {}
+    for theme_name in per_week.index:
+        current = int(this_counts[theme_name])
+        previous = int(prev_counts[theme_name])
+        deltas[theme_name] = {
+            "current": current,
+            "previous": previous,
+            "delta": current - previous,
+            "pct": round((current - previous) / previous * 100) if previous else None,
+        }
+    return summaries, deltas
+
+def generate_multi_window_report(df, windows=None):
+    """1/4/8-week (configurable) views side by side from one aggregation pass."""
+    print("--- Generating Multi-Window Summary ---")
+    config = load_config()
+    app_name = config.get("APP_NAME", "App")
+    period_weeks = config.get("DATE_RANGE_WEEKS", 8)
+    windows = windows or config.get("REPORT_WINDOWS_WEEKS", [1, 4, 8])
+    if max(windows) > period_weeks:
+        print(f"Warning: windows longer than DATE_RANGE_WEEKS ({period_weeks}) are capped to the report period.")
+    # The widest window is always the main report's period, so their totals agree
+    windows = sorted({min(w, period_weeks) for w in windows} | {period_weeks})
+
+    weekly, end = build_weekly_aggregates(df)
+    summaries, deltas = summarize_windows(weekly, windows, end)
+
+    content = f"# {app_name} — Multi-Window Theme Summary\n"
+    content += f"Trailing 7-day weeks ending: {end.strftime('%b %d, %Y')}\n\n"
+
+    content += "## Theme Volume by Window\n"
+    content += "| Theme | " + " | ".join(f"{w}w" for w in windows) + " | WoW Δ |\n"
+    content += "|---|" + "---:|" * len(windows) + "---:|\n"
+    themes_order = list(summaries[windows[-1]]["themes"].keys())
+    for theme_name in themes_order:
+        cells = []
+        for w in windows:
+            count = summaries[w]["themes"].get(theme_name, 0)
+            share = count / summaries[w]["total"] * 100 if summaries[w]["total"] else 0
+            cells.append(f"{count} ({share:.0f}%)")
+        d = deltas.get(theme_name, {"delta": 0, "pct": None})
+        delta_str = f"{d['delta']:+d}" + (f" ({d['pct']:+d}%)" if d['pct'] is not None else "")
+        content += f"| {theme_name} | " + " | ".join(cells) + f" | {delta_str} |\n"
+
+    content += "\n## Rating Distribution by Window\n"
+    content += "| Window | Reviews | 1–2★ | 3★ | 4–5★ |\n"
+    content += "|---|---:|---:|---:|---:|\n"
+    for w in windows:
+        s = summaries[w]
+        content += f"| {w}w (since {s['start'].strftime('%b %d')}) | {s['total']} | {s['dist']['1-2']}% | {s['dist']['3']}% | {s['dist']['4-5']}% |\n"
+
+    os.makedirs("outputs", exist_ok=True)
+    with open("outputs/multi_window_summary.md", "w", encoding='utf-8') as f:
+        f.write(content)
+    print("Saved multi_window_summary.md")
+    return summaries, deltas
+
+def build_breakdown_document(df_mapping, themes, app_name, pool=None):
+    """Document model for the detailed breakdown.
+
+    Representative reviews are sampled once here so the markdown and the PDF
+    always show the same reviews. With a QuotePool, quotes, counts and the star
+    distribution come from the pool and the themed table is not scanned at all.
+    """
+    if pool is not None:
+        total_all = pool.total()
+        dist = rating_distribution_from_counts(pool.rating_counts())
+    else:
+        total_all = len(df_mapping)
+        dist = rating_distribution(df_mapping)
+
+    sections = []
+    breakdown_themes = list(themes[:5])
+    # The Other bucket is where new problems first appear, so show its drill-down even outside the top 5
+    breakdown_themes += [t for t in themes[5:] if t.get('subgroups')]
+    for theme in breakdown_themes:
+        if pool is not None:
+            count = pool.count(theme['theme_name'])
+            reps = pool.sample(theme['theme_name'])
+        else:
+            t_df = df_mapping[df_mapping['theme_name'] == theme['theme_name']]
+            count = len(t_df)
+            reps = t_df.sample(min(len(t_df), 3), random_state=42).to_dict('records')
+        sections.append({
+            "theme_name": theme['theme_name'],
+            "description": theme['description'],
+            "count": count,
+            "percent": (count / total_all) * 100 if total_all > 0 else 0,
+            "quotes": [{"rating": row['rating'], "text": row['review_text']} for row in reps],
+            "subgroups": theme.get('subgroups', []),
+        })
+
+    return {
+        "title": f"Detailed Theme Breakdown — {app_name}",
+        # Global Star Distribution (Rounded whole %)
+        "dist": dist,
+        "sections": sections,
+    }
+
+def generate_detailed_breakdown(df_mapping, themes, pool=None):
     """Objective 3: Exec-safe PDF breakdown."""
     print("--- Generating Detailed Theme Breakdown (PDF) ---")
     config = load_config()
     app_name = config.get("APP_NAME", "App")
     
-    md_content = f"# Detailed Theme Breakdown — {app_name}\n\n"
-    total_all = len(df_mapping)
-    
-    # Global Star Distribution (Rounded whole %)
-    g_low = round((len(df_mapping[df_mapping['rating'] <= 2]) / total_all) * 100) if total_all > 0 else 0
-    g_mid = round((len(df_mapping[df_mapping['rating'] == 3]) / total_all) * 100) if total_all > 0 else 0
-    g_high = round((len(df_mapping[df_mapping['rating'] >= 4]) / total_all) * 100) if total_all > 0 else 0
-
-    # -------- PDF Setup (Unicode-safe) --------
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    
-    FONT_PATH = os.path.join(
-        os.path.dirname(os.path.dirname(__file__)),
-        "assets",
-        "fonts",
-        "DejaVuSans.ttf"
-    )
-
-    if os.path.exists(FONT_PATH):
-        pdf.add_font("DejaVu", "", FONT_PATH, uni=True)
-        pdf.add_font("DejaVu", "B", FONT_PATH, uni=True)
-        pdf.add_font("DejaVu", "I", FONT_PATH, uni=True)
-        font_family = "DejaVu"
-    else:
-        print("Warning: DejaVuSans.ttf not found. Falling back to Arial.")
-        font_family = "Arial"
-
-    # Title Layer
-    pdf.set_font(font_family, "B", 16)
-    pdf.set_x(pdf.l_margin)
-    pdf.multi_cell(0, 10, f"Detailed Theme Breakdown — {app_name}" )
-    pdf.ln(5)
+    doc = build_breakdown_document(df_mapping, themes, app_name, pool=pool)
     
-    for theme in themes[:5]:
-        t_name = theme['theme_name']
-        t_desc = theme['description']
-        
-        t_df = df_mapping[df_mapping['theme_name'] == t_name]
-        count = len(t_df)
-        percent = (count / total_all) * 100 if total_all > 0 else 0
-        
-        # MD Content
-        md_content += f"### Theme: {t_name}\n"
-        md_content += f"**Why this matters:** {t_desc}\n\n"
-        md_content += f"**Volume:**\n- Total reviews: {count}\n- % of total: {percent:.1f}%\n"
-        md_content += f"**Star Distribution (Overall Period):**\n- 1–2★: {g_low}%\n- 3★: {g_mid}%\n- 4–5★: {g_high}%\n\n"
-        md_content += "**Representative Reviews:**\n"
-        
-        reps = t_df.sample(min(len(t_df), 3), random_state=42)
-        for _, row in reps.iterrows():
-            stars = "★" * int(row['rating'])
-            md_content += f"- {stars} \"{row['review_text'][:150]}...\"\n"
-        md_content += "\n---\n\n"
-        
-        # PDF Section - Strict Left Alignment
-        pdf.set_x(pdf.l_margin)
-        pdf.set_font(font_family, "B", 13)
-        pdf.multi_cell(0, 8, f"Theme: {t_name}" )
-        pdf.ln(1)
-
-        pdf.set_x(pdf.l_margin)
-        pdf.set_font(font_family, "B", 10)
-        pdf.multi_cell(0, 6, "Why this matters:" )
-        pdf.set_font(font_family, "", 10)
-        pdf.set_x(pdf.l_margin)
-        pdf.multi_cell(0, 5, t_desc )
-        pdf.ln(3)
-
-        pdf.set_x(pdf.l_margin)
-        pdf.set_font(font_family, "B", 10)
-        pdf.multi_cell(0, 6, "Volume:" )
-        pdf.set_font(font_family, "", 10)
-        pdf.set_x(pdf.l_margin)
-        pdf.multi_cell(0, 5, f"{count} reviews ({percent:.1f}%)" )
-        pdf.ln(3)
-
-        pdf.set_x(pdf.l_margin)
-        pdf.set_font(font_family, "B", 10)
-        pdf.multi_cell(0, 6, "Star Distribution (Overall Period):" )
-        pdf.set_font(font_family, "", 10)
-        pdf.set_x(pdf.l_margin)
-        pdf.multi_cell(0, 5, f"1–2★: {g_low}%" )
-        pdf.set_x(pdf.l_margin)
-        pdf.multi_cell(0, 5, f"3★: {g_mid}%" )
-        pdf.set_x(pdf.l_margin)
-        pdf.multi_cell(0, 5, f"4–5★: {g_high}%" )
-        pdf.ln(3)
-
-        pdf.set_x(pdf.l_margin)
-        pdf.set_font(font_family, "B", 10)
-        pdf.multi_cell(0, 6, "Representative Reviews:" )
-        pdf.set_font(font_family, "", 9)
-        for _, row in reps.iterrows():
-            stars = "★" * int(row["rating"])
-            text = row["review_text"]
-            if len(text) > 250: text = text[:247] + "..."
-            
-            try:
-                pdf.set_x(pdf.l_margin)
-                pdf.multi_cell(0, 5, f"- [{stars}] {text}" )
-                pdf.ln(1)
-            except:
-                 pdf.set_x(pdf.l_margin)
-                 pdf.multi_cell(0, 5, f"- [{stars}] [Internal formatting error]" )
-
-        pdf.ln(8)
-
+    os.makedirs("outputs", exist_ok=True)
     with open("outputs/detailed_theme_breakdown.md", "w", encoding='utf-8') as f:
-        f.write(md_content)
+        f.write(render_breakdown_markdown(doc))
         
     try:
         pdf_path = "outputs/detailed_theme_breakdown.pdf"
-        pdf.output(pdf_path)
+        render_breakdown_pdf(doc, pdf_path)
         print(f"Saved {pdf_path}")
     except Exception as e:
         print(f"PDF generation failed: {e}")
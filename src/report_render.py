@@ -0,0 +1,179 @@
+"""Rendering layer for the weekly reports.
+
+Reports are built once as a plain document model (dicts, see `report_gen`)
+and rendered from that single model to markdown, email text and PDF.
+
+The DejaVu font is registered once instead of once per style. A blank FPDF
+template with the font registered is also cached in memory, and every new PDF
+starts from a deep copy of it, so each document still gets its own glyph subset.
+That cache only pays off when one process renders several PDFs; the pipeline
+(`main.py`, started fresh by `run_weekly.py`) renders one, so there it just parses
+the font once rather than three times. fpdf2 fonts cannot be pickled, so the
+template is not persisted across runs.
+"""
+import os
+import copy
+from fpdf import FPDF
+
+FONT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    "assets",
+    "fonts",
+    "DejaVuSans.ttf"
+)
+
+_PDF_TEMPLATES = {}
+
+def _stars(rating):
+    return "★" * int(rating)
+
+def _truncate(text, limit):
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+# =========================================================
+# Weekly pulse: note (markdown) and email
+# =========================================================
+
+def render_weekly_note(doc):
+    content = f"# {doc['app_name']} — Weekly App Review Pulse\n"
+    content += f"Period: {doc['start_date']} - {doc['end_date']}\n\n"
+    content += "## Top Themes\n"
+    for i, t in enumerate(doc['top_themes'], 1):
+        content += f"{i}. {t['theme_name']}: {t['count']} reviews\n"
+
+    content += "\n## What Users Are Saying\n"
+    for t_quote in doc['quotes']:
+        for q in t_quote['quotes']:
+            content += f"• [{t_quote['theme']}] \"{q['quote']}\"\n"
+
+    content += "\n## Action Ideas\n"
+    for i, t in enumerate(doc['top_themes'], 1):
+        content += f"{i}. {t['action'] or 'Investigate user concerns.'}\n"
+    return content.strip()
+
+def render_email(doc):
+    themes = doc['top_themes']
+    dist = doc['dist']
+    content = f"Subject: {doc['app_name']} — Weekly App Review Pulse ({doc['week_str']})\n\n"
+    content += "Hi team,\n\n"
+    content += f"Recent feedback for {doc['app_name']} highlights {themes[0]['theme_name']} and {themes[1]['theme_name']} as key focus areas.\n\n"
+
+    content += "## Top Themes\n"
+    for t in themes:
+        content += f"- {t['theme_name']} ({t['count']} reviews)\n"
+
+    content += "\n## Rating Distribution (This Period)\n"
+    content += f"- 1–2★: {dist['1-2']}%\n"
+    content += f"- 3★: {dist['3']}%\n"
+    content += f"- 4–5★: {dist['4-5']}%\n\n"
+
+    content += "## Action Ideas\n"
+    for t in themes:
+        content += f"- {t['action'] or 'Analyze emerging issues.'}\n"
+
+    content += "\nBest,\nProduct Manager"
+    return content.strip()
+
+# =========================================================
+# Detailed breakdown: markdown and PDF
+# =========================================================
+
+def render_breakdown_markdown(doc):
+    dist = doc['dist']
+    content = f"# {doc['title']}\n\n"
+    for section in doc['sections']:
+        content += f"### Theme: {section['theme_name']}\n"
+        content += f"**Why this matters:** {section['description']}\n\n"
+        content += f"**Volume:**\n- Total reviews: {section['count']}\n- % of total: {section['percent']:.1f}%\n"
+        content += f"**Star Distribution (Overall Period):**\n- 1–2★: {dist['1-2']}%\n- 3★: {dist['3']}%\n- 4–5★: {dist['4-5']}%\n\n"
+        content += "**Representative Reviews:**\n"
+        for q in section['quotes']:
+            content += f"- {_stars(q['rating'])} \"{q['text'][:150]}...\"\n"
+        if section.get('subgroups'):
+            content += "\n**Emerging Sub-Themes:**\n"
+            for g in section['subgroups']:
+                content += f"- {g['label']}: {g['count']} reviews ({g['share']:.1f}%)\n"
+        content += "\n---\n\n"
+    return content
+
+def get_pdf_template(font_path=FONT_PATH):
+    """Return (blank FPDF with the font registered, font family), parsing the font only once."""
+    if font_path not in _PDF_TEMPLATES:
+        template = FPDF()
+        template.set_auto_page_break(auto=True, margin=15)
+        if os.path.exists(font_path):
+            # Regular, bold and italic all pointed at the same file before, so one
+            # registration renders identically and avoids parsing the TTF three times
+            template.add_font("DejaVu", "", font_path)
+            font_family = "DejaVu"
+        else:
+            print("Warning: DejaVuSans.ttf not found. Falling back to Arial.")
+            font_family = "Arial"
+        _PDF_TEMPLATES[font_path] = (template, font_family)
+    return _PDF_TEMPLATES[font_path]
+
+def clear_pdf_template_cache():
+    _PDF_TEMPLATES.clear()
+
+class _PdfWriter:
+    """Thin wrapper that keeps every line left-aligned and only switches font when needed."""
+
+    def __init__(self, pdf, font_family):
+        self.pdf = pdf
+        self.family = font_family
+        # The embedded DejaVu file has no bold face; the core Arial fallback does
+        self.bold = "B" if font_family == "Arial" else ""
+
+    def line(self, text, size, height, bold=False):
+        self.pdf.set_font(self.family, self.bold if bold else "", size)
+        self.pdf.multi_cell(0, height, text, new_x="LMARGIN", new_y="NEXT")
+
+    def gap(self, height):
+        self.pdf.ln(height)
+
+def render_breakdown_pdf(doc, pdf_path, font_path=FONT_PATH):
+    template, font_family = get_pdf_template(font_path)
+    pdf = copy.deepcopy(template)
+    pdf.add_page()
+    w = _PdfWriter(pdf, font_family)
+    dist = doc['dist']
+
+    w.line(doc['title'], 16, 10, bold=True)
+    w.gap(5)
+
+    for section in doc['sections']:
+        w.line(f"Theme: {section['theme_name']}", 13, 8, bold=True)
+        w.gap(1)
+
+        w.line("Why this matters:", 10, 6, bold=True)
+        w.line(section['description'], 10, 5)
+        w.gap(3)
+
+        w.line("Volume:", 10, 6, bold=True)
+        w.line(f"{section['count']} reviews ({section['percent']:.1f}%)", 10, 5)
+        w.gap(3)
+
+        w.line("Star Distribution (Overall Period):", 10, 6, bold=True)
+        w.line(f"1–2★: {dist['1-2']}%", 10, 5)
+        w.line(f"3★: {dist['3']}%", 10, 5)
+        w.line(f"4–5★: {dist['4-5']}%", 10, 5)
+        w.gap(3)
+
+        w.line("Representative Reviews:", 10, 6, bold=True)
+        for q in section['quotes']:
+            stars = _stars(q['rating'])
+            try:
+                w.line(f"- [{stars}] {_truncate(q['text'], 250)}", 9, 5)
+            except Exception:
+                w.line(f"- [{stars}] [Internal formatting error]", 9, 5)
+            w.gap(1)
+
+        if section.get('subgroups'):
+            w.gap(2)
+            w.line("Emerging Sub-Themes:", 10, 6, bold=True)
+            for g in section['subgroups']:
+                w.line(f"- {g['label']}: {g['count']} reviews ({g['share']:.1f}%)", 9, 5)
+
+        w.gap(8)
+
+    pdf.output(pdf_path)
@@ -0,0 +1,278 @@
+"""Persistent vector similarity index over historical reviews.
+
+Stores the embeddings `discover_themes` already computes, appended run by run:
+
+    data/models/review_index/vectors.f32  unit-normalised float32 rows (memory-mapped on read)
+    data/models/review_index/meta.csv     review_id, date, rating, theme_name, review_text per row
+    data/models/review_index/keys.txt     dedup key per row (see `review_keys`), read on each add
+    data/models/review_index/ivf.npz      coarse centroids + list assignment for approximate search
+
+Search is exact brute force (one matrix-vector product) for small corpora and an
+IVF approximate search (probe the `nprobe` nearest coarse lists) for large ones.
+Both support theme, rating and date-range filters.
+
+    python -m src.review_index query "refund not received" --k 5 --theme "Payments & Refunds"
+"""
+import os
+import sys
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.review_store import content_keys
+
+META_COLUMNS = ['review_id', 'date', 'rating', 'theme_name', 'review_text']
+
+def load_config():
+    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "config.json")
+    with open(config_path, "r") as f:
+        return json.load(f)
+
+def review_keys(df, use_ids=True):
+    """Dedup key per review: its review_id, or a content hash when the ids are not real.
+
+    Pass use_ids=False when review_id was made up positionally (e.g. `rev_{i}`),
+    otherwise a later run's new reviews would collide with already indexed ones.
+    """
+    if use_ids and 'review_id' in df.columns:
+        return pd.Series(df['review_id'].astype(str).values, index=df.index)
+    return pd.Series(content_keys(df), index=df.index)
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+class ReviewIndex:
+    def __init__(self, index_dir=None):
+        config = load_config()
+        self.index_dir = index_dir or os.path.join(BASE_DIR, config.get("INDEX_DIR", os.path.join("data", "models", "review_index")))
+        self.exact_max = config.get("INDEX_EXACT_MAX", 50000)
+        self.nlist = config.get("INDEX_NLIST", None)
+        self.nprobe = config.get("INDEX_NPROBE", 8)
+        self.vectors_path = os.path.join(self.index_dir, "vectors.f32")
+        self.meta_path = os.path.join(self.index_dir, "meta.csv")
+        self.keys_path = os.path.join(self.index_dir, "keys.txt")
+        self.manifest_path = os.path.join(self.index_dir, "manifest.json")
+        self.ivf_path = os.path.join(self.index_dir, "ivf.npz")
+        self._vectors = None
+        self._meta = None
+        self._ivf = None
+
+    # ---------------- storage ----------------
+
+    def _manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {"dim": None, "count": 0}
+        with open(self.manifest_path, "r") as f:
+            return json.load(f)
+
+    def __len__(self):
+        return self._manifest()["count"]
+
+    @property
+    def vectors(self):
+        if self._vectors is None:
+            manifest = self._manifest()
+            if manifest["count"] == 0:
+                return np.zeros((0, manifest["dim"] or 0), dtype=np.float32)
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                      shape=(manifest["count"], manifest["dim"]))
+        return self._vectors
+
+    @property
+    def meta(self):
+        if self._meta is None:
+            if os.path.exists(self.meta_path):
+                self._meta = pd.read_csv(self.meta_path, parse_dates=['date'])
+            else:
+                self._meta = pd.DataFrame(columns=META_COLUMNS)
+        return self._meta
+
+    def _indexed_keys(self):
+        """Keys of every indexed row, from keys.txt alone (meta.csv is not read)."""
+        if not os.path.exists(self.keys_path):
+            if not os.path.exists(self.meta_path):
+                return set()
+            # Index written before keys were persisted: derive them once from the metadata
+            with open(self.keys_path, "w", encoding="utf-8") as f:
+                f.writelines(k + "\n" for k in review_keys(self.meta))
+        with open(self.keys_path, "r", encoding="utf-8") as f:
+            return set(f.read().splitlines())
+
+    def add(self, embeddings, df, use_ids=True):
+        """Append reviews not yet indexed (see `review_keys`). Returns the number of rows added."""
+        manifest = self._manifest()
+        embeddings = _normalize(embeddings)
+        if manifest["dim"] is not None and embeddings.shape[1] != manifest["dim"]:
+            raise ValueError(f"Embedding dim {embeddings.shape[1]} does not match index dim {manifest['dim']}")
+
+        df = df.reset_index(drop=True)
+        keys = review_keys(df, use_ids)
+        is_new = ~keys.isin(self._indexed_keys()) & ~keys.duplicated()
+        if not is_new.any():
+            print("Review index already up to date.")
+            return 0
+
+        new_vectors = embeddings[is_new.values]
+        new_meta = df.loc[is_new, META_COLUMNS]
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(new_vectors).tobytes())
+        new_meta.to_csv(self.meta_path, mode="a", header=not os.path.exists(self.meta_path), index=False)
+        with open(self.keys_path, "a", encoding="utf-8") as f:
+            f.writelines(k + "\n" for k in keys[is_new])
+
+        count = manifest["count"] + len(new_meta)
+        with open(self.manifest_path, "w") as f:
+            json.dump({"dim": int(embeddings.shape[1]), "count": count}, f)
+
+        self._vectors, self._meta = None, None
+        self._update_ivf(new_vectors, count)
+        print(f"Indexed {len(new_meta)} new reviews ({count} total) in {self.index_dir}")
+        return len(new_meta)
+
+    # ---------------- approximate (IVF) structure ----------------
+
+    def _update_ivf(self, new_vectors, count):
+        """Assign new rows to the existing coarse lists; retrain once the index has doubled."""
+        if count < self.exact_max and not os.path.exists(self.ivf_path):
+            return
+        if os.path.exists(self.ivf_path):
+            with np.load(self.ivf_path) as data:
+                centroids, assign, trained_on = data["centroids"], data["assign"], int(data["trained_on"])
+            if count <= 2 * trained_on:
+                assign = np.concatenate([assign, self._nearest_lists(new_vectors, centroids)])
+                np.savez(self.ivf_path, centroids=centroids, assign=assign, trained_on=trained_on)
+                self._ivf = None
+                return
+        self.train_ivf()
+
+    @staticmethod
+    def _nearest_lists(vectors, centroids, batch=65536):
+        out = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), batch):
+            out[start:start + batch] = (vectors[start:start + batch] @ centroids.T).argmax(axis=1)
+        return out
+
+    def train_ivf(self, nlist=None):
+        from sklearn.cluster import MiniBatchKMeans
+
+        vectors = self.vectors
+        nlist = nlist or self.nlist or max(16, int(np.sqrt(len(vectors))))
+        print(f"Training IVF index with {nlist} lists on {len(vectors)} vectors...")
+        sample = vectors[np.random.default_rng(42).choice(len(vectors), min(len(vectors), nlist * 256), replace=False)]
+        kmeans = MiniBatchKMeans(n_clusters=nlist, random_state=42, n_init=3, batch_size=4096).fit(sample)
+        centroids = _normalize(kmeans.cluster_centers_)
+        assign = self._nearest_lists(vectors, centroids)
+        np.savez(self.ivf_path, centroids=centroids, assign=assign, trained_on=len(vectors))
+        self._ivf = None
+
+    @property
+    def ivf(self):
+        if self._ivf is None:
+            if not os.path.exists(self.ivf_path):
+                self.train_ivf()
+            with np.load(self.ivf_path) as data:
+                centroids, assign = data["centroids"], data["assign"]
+            order = np.argsort(assign, kind="stable")
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=len(centroids)))])
+            self._ivf = {"centroids": centroids, "order": order, "offsets": offsets}
+        return self._ivf
+
+    # ---------------- search ----------------
+
+    def _filter_mask(self, theme=None, ratings=None, start=None, end=None):
+        meta = self.meta
+        mask = np.ones(len(meta), dtype=bool)
+        if theme:
+            mask &= (meta['theme_name'] == theme).values
+        if ratings:
+            mask &= meta['rating'].isin(ratings).values
+        if start is not None:
+            mask &= (meta['date'] >= pd.Timestamp(start)).values
+        if end is not None:
+            mask &= (meta['date'] < pd.Timestamp(end)).values
+        return mask
+
+    def search(self, query_vector, k=10, theme=None, ratings=None, start=None, end=None, mode="auto", nprobe=None):
+        """Top-k most similar indexed reviews as a DataFrame with a `similarity` column."""
+        query = _normalize(query_vector)[0]
+        vectors = self.vectors
+        if len(vectors) == 0:
+            return pd.DataFrame(columns=META_COLUMNS + ['similarity'])
+
+        has_filters = any(v is not None and v != [] for v in (theme, ratings, start, end))
+        mask = self._filter_mask(theme, ratings, start, end) if has_filters else None
+
+        if mode == "auto":
+            mode = "exact" if len(vectors) < self.exact_max else "ann"
+
+        if mode == "exact":
+            candidates = np.flatnonzero(mask) if mask is not None else np.arange(len(vectors))
+        else:
+            ivf = self.ivf
+            nprobe = nprobe or self.nprobe
+            probe = np.argsort(-(ivf["centroids"] @ query))[:nprobe]
+            candidates = np.concatenate([ivf["order"][ivf["offsets"][p]:ivf["offsets"][p + 1]] for p in probe])
+            if mask is not None:
+                candidates = candidates[mask[candidates]]
+
+        if len(candidates) == 0:
+            return pd.DataFrame(columns=META_COLUMNS + ['similarity'])
+
+        if len(candidates) == len(vectors):
+            sims = np.asarray(vectors @ query)
+        else:
+            candidates = np.sort(candidates)
+            sims = np.asarray(vectors[candidates] @ query)
+        k = min(k, len(sims))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        rows = candidates[top]
+
+        results = self.meta.iloc[rows].copy()
+        results['similarity'] = np.round(sims[top], 4)
+        return results.reset_index(drop=True)
+
+def main():
+    from src.model_registry import load_sentence_model
+
+    parser = argparse.ArgumentParser(description="Find historical reviews similar to a text")
+    sub = parser.add_subparsers(dest="command", required=True)
+    query = sub.add_parser("query", help="Top-k similar reviews")
+    query.add_argument("text")
+    query.add_argument("--k", type=int, default=10)
+    query.add_argument("--theme")
+    query.add_argument("--rating", type=int, nargs="+", help="One or more star ratings")
+    query.add_argument("--since", help="Start date (inclusive), e.g. 2026-01-01")
+    query.add_argument("--until", help="End date (exclusive)")
+    query.add_argument("--mode", choices=["auto", "exact", "ann"], default="auto")
+    sub.add_parser("info", help="Show index size")
+    args = parser.parse_args()
+
+    index = ReviewIndex()
+    if args.command == "info":
+        print(f"{len(index)} reviews indexed in {index.index_dir}")
+        return
+
+    model = load_sentence_model()
+    query_vector = model.encode([args.text], show_progress_bar=False)[0]
+    results = index.search(query_vector, k=args.k, theme=args.theme, ratings=args.rating,
+                           start=args.since, end=args.until, mode=args.mode)
+    if results.empty:
+        print("No matching reviews.")
+        return
+    for _, row in results.iterrows():
+        text = row['review_text'] if len(row['review_text']) <= 200 else row['review_text'][:197] + "..."
+        print(f"[{row['similarity']:.3f}] {pd.Timestamp(row['date']).date()} {'★' * int(row['rating'])} "
+              f"({row['theme_name']}) {text}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Week-partitioned on-disk review store.
+
+Reviews are stored per layer ("raw" / "processed"), app and ISO week:
+
+    data/store/<layer>/app=<app_id>/week=<YYYY>-W<ww>/part-<timestamp>.csv
+
+Readers only open the partitions whose week overlaps the requested date window,
+so the cost of a run tracks the window size rather than the retained history.
+Each write appends a new part file; `compact_partition` merges parts and drops
+duplicates, and `apply_retention` expires partitions older than the retention window.
+"""
+import os
+import json
+import shutil
+import hashlib
+from datetime import datetime, timedelta
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_config():
+    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "config.json")
+    with open(config_path, "r") as f:
+        return json.load(f)
+
+def store_root():
+    return os.path.join(BASE_DIR, load_config().get("STORE_ROOT", os.path.join("data", "store")))
+
+def iso_week_key(ts):
+    year, week, _ = pd.Timestamp(ts).isocalendar()
+    return f"{year}-W{week:02d}"
+
+def week_bounds(week_key):
+    """Return [start, end) datetimes of an ISO week key such as '2026-W06'."""
+    start = datetime.strptime(week_key + "-1", "%G-W%V-%u")
+    return start, start + timedelta(weeks=1)
+
+def partition_dir(layer, app_id, week_key, root=None):
+    return os.path.join(root or store_root(), layer, f"app={app_id}", f"week={week_key}")
+
+def list_partitions(layer, app_id, root=None):
+    """Return [(week_key, path)] for an app, oldest first."""
+    app_dir = os.path.join(root or store_root(), layer, f"app={app_id}")
+    if not os.path.isdir(app_dir):
+        return []
+    partitions = []
+    for name in os.listdir(app_dir):
+        if name.startswith("week="):
+            partitions.append((name[len("week="):], os.path.join(app_dir, name)))
+    return sorted(partitions)
+
+def content_keys(df):
+    """SHA-1 of each review's (date, review_text), for matching reviews by content."""
+    return [
+        hashlib.sha1(f"{d}\x1f{t}".encode("utf-8")).hexdigest()
+        for d, t in zip(pd.to_datetime(df['date']).astype(str), df['review_text'].astype(str))
+    ]
+
+def _dedupe(df):
+    if 'source_key' in df.columns:
+        keys = ['source_key']
+    elif 'review_id' in df.columns:
+        keys = ['review_id']
+    else:
+        keys = ['date', 'review_text']
+    return df.drop_duplicates(subset=keys, keep='last')
+
+def _read_partition(path):
+    parts = sorted(f for f in os.listdir(path) if f.endswith(".csv"))
+    frames = [pd.read_csv(os.path.join(path, f)) for f in parts]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+def write_partitions(df, layer, app_id, root=None):
+    """Append reviews to their week partitions. Returns the list of week keys touched."""
+    if df.empty:
+        return []
+    df = df.copy()
+    df['date'] = pd.to_datetime(df['date'])
+    stamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
+
+    weeks = df['date'].map(iso_week_key)
+    for week_key, part in df.groupby(weeks):
+        path = partition_dir(layer, app_id, week_key, root)
+        os.makedirs(path, exist_ok=True)
+        part.to_csv(os.path.join(path, f"part-{stamp}.csv"), index=False)
+    print(f"Wrote {len(df)} {layer} reviews to {weeks.nunique()} week partitions for {app_id}")
+    return sorted(weeks.unique())
+
+def read_window(layer, app_id, start, end=None, root=None):
+    """Read reviews with start <= date < end, opening only the overlapping week partitions."""
+    start = pd.Timestamp(start)
+    end = pd.Timestamp(end) if end is not None else None
+
+    frames = []
+    opened = 0
+    for week_key, path in list_partitions(layer, app_id, root):
+        week_start, week_end = week_bounds(week_key)
+        if week_end <= start or (end is not None and week_start >= end):
+            continue
+        frames.append(_read_partition(path))
+        opened += 1
+
+    if not frames:
+        return pd.DataFrame()
+
+    df = _dedupe(pd.concat(frames, ignore_index=True))
+    df['date'] = pd.to_datetime(df['date'])
+    mask = df['date'] >= start
+    if end is not None:
+        mask &= df['date'] < end
+    print(f"Read {int(mask.sum())} {layer} reviews for {app_id} from {opened} week partitions")
+    return df[mask].reset_index(drop=True)
+
+def latest_review_date(layer, app_id, root=None):
+    """Most recent review date in the store, reading only the newest partition."""
+    partitions = list_partitions(layer, app_id, root)
+    if not partitions:
+        return None
+    df = _read_partition(partitions[-1][1])
+    if df.empty:
+        return None
+    return pd.to_datetime(df['date']).max().to_pydatetime()
+
+def compact_partition(path):
+    """Merge all part files of a partition into one de-duplicated file."""
+    parts = sorted(f for f in os.listdir(path) if f.endswith(".csv"))
+    if len(parts) <= 1:
+        return False
+    df = _dedupe(_read_partition(path))
+    tmp_path = os.path.join(path, "compacted.tmp")
+    df.to_csv(tmp_path, index=False)
+    for f in parts:
+        os.remove(os.path.join(path, f))
+    os.replace(tmp_path, os.path.join(path, "part-00000000000000000000.csv"))
+    return True
+
+def apply_retention(layer, app_id, retention_weeks=None, reference_date=None, root=None):
+    """Expire partitions that ended before the retention window and compact the rest."""
+    retention_weeks = retention_weeks or load_config().get("RETENTION_WEEKS", 52)
+    reference_date = reference_date or datetime.now()
+    cutoff = reference_date - timedelta(weeks=retention_weeks)
+
+    expired, compacted = 0, 0
+    for week_key, path in list_partitions(layer, app_id, root):
+        _, week_end = week_bounds(week_key)
+        if week_end <= cutoff:
+            shutil.rmtree(path)
+            expired += 1
+        elif compact_partition(path):
+            compacted += 1
+    print(f"Retention ({retention_weeks} weeks) for {layer}/{app_id}: "
+          f"expired {expired} partitions, compacted {compacted}")
+    return expired, compacted
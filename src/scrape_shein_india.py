@@ -1,9 +1,14 @@
 import os
+import sys
 import json
 import pandas as pd
 from datetime import datetime, timedelta
 from google_play_scraper import reviews, Sort
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.review_store import write_partitions, read_window, latest_review_date, apply_retention
+
 def load_config():
     config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "config.json")
     with open(config_path, "r") as f:
@@ -18,29 +23,43 @@ def run_scraper(app_id=None):
     
     # Calculate date cutoff
     cutoff_date = datetime.now() - timedelta(weeks=weeks)
+    # Only fetch what the store does not already have
+    latest_stored = latest_review_date("raw", app_id)
+    fetch_since = max(cutoff_date, latest_stored) if latest_stored else cutoff_date
     print(f"Scraping {app_id}")
-    print(f"Filtering reviews since: {cutoff_date.date()}")
+    print(f"Fetching reviews since: {fetch_since} (window starts {cutoff_date.date()})")
     
     all_captured = []
     
     # Ratings 1 to 4
     for score in [1, 2, 3, 4]:
         print(f"Fetching reviews with rating {score}...")
-        result, _ = reviews(
-            app_id,
-            lang=lang,
-            country=country,
-            sort=Sort.NEWEST,
-            count=500,
-            filter_score_with=score
-        )
+        continuation_token = None
+        fetched = 0
         
-        for r in result:
-            review_at = r['at']
-            if isinstance(review_at, str):
-                review_at = datetime.fromisoformat(review_at)
+        # Reviews come back newest first, so stop paging as soon as a page crosses the cutoff
+        while fetched < 500:
+            result, continuation_token = reviews(
+                app_id,
+                lang=lang,
+                country=country,
+                sort=Sort.NEWEST,
+                count=min(100, 500 - fetched),
+                filter_score_with=score,
+                continuation_token=continuation_token
+            )
+            fetched += len(result)
             
-            if review_at >= cutoff_date:
+            reached_cutoff = False
+            for r in result:
+                review_at = r['at']
+                if isinstance(review_at, str):
+                    review_at = datetime.fromisoformat(review_at)
+                
+                if review_at < fetch_since:
+                    reached_cutoff = True
+                    continue
+                
                 all_captured.append({
                     'review_id': r.get('reviewId', ''),
                     'rating': r['score'],
@@ -48,14 +67,22 @@ def run_scraper(app_id=None):
                     'date': review_at.strftime('%Y-%m-%d %H:%M:%S'),
                     'app_id': app_id  # Store package ID in metadata
                 })
+            
+            if reached_cutoff or not result or not continuation_token:
+                break
         
-        print(f"Found {len(all_captured)} total reviews so far.")
+        print(f"Found {len(all_captured)} total new reviews so far.")
 
-    if not all_captured:
+    if all_captured:
+        write_partitions(pd.DataFrame(all_captured), "raw", app_id)
+    apply_retention("raw", app_id)
+    
+    # Materialise the analysis window from the overlapping week partitions only
+    df = read_window("raw", app_id, cutoff_date)
+    if df.empty:
         print("No reviews found for the given criteria.")
         return
-
-    df = pd.DataFrame(all_captured)
+    df['date'] = df['date'].dt.strftime('%Y-%m-%d %H:%M:%S')
     
     # Save to the expected raw data path
     output_path = "data/raw/shein_reviews_raw.csv"
@@ -0,0 +1,162 @@
+"""Minimal in-process SMTP server for exercising email delivery end to end.
+
+It speaks just enough SMTP for smtplib (EHLO, AUTH PLAIN/LOGIN, MAIL, RCPT,
+DATA, NOOP, RSET, QUIT) and keeps every received message in memory.
+STARTTLS is not supported, so point the delivery at it with starttls off.
+
+    python -m src.smtp_stub --recipients 50
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+import socketserver
+from email import message_from_bytes
+from email.policy import default
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write((line + "\r\n").encode("ascii"))
+
+    def handle(self):
+        stub = self.server.stub
+        with stub.lock:
+            stub.connections += 1
+        self._reply("220 localhost SMTP stub ready")
+        mail_from, rcpt_to = None, []
+
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            command = line.split(" ", 1)[0].upper()
+
+            if command == "EHLO":
+                self._reply("250-localhost")
+                self._reply("250-AUTH PLAIN LOGIN")
+                self._reply("250 8BITMIME")
+            elif command == "HELO":
+                self._reply("250 localhost")
+            elif command == "AUTH":
+                if line.upper().startswith("AUTH LOGIN"):
+                    self._reply("334 VXNlcm5hbWU6")
+                    self.rfile.readline()
+                    self._reply("334 UGFzc3dvcmQ6")
+                    self.rfile.readline()
+                self._reply("235 Authentication successful")
+            elif command == "MAIL":
+                mail_from, rcpt_to = line[10:].strip(), []
+                self._reply("250 OK")
+            elif command == "RCPT":
+                address = line[8:].strip().strip("<>").split(">")[0]
+                with stub.lock:
+                    fail = stub.fail_next > 0
+                    if fail:
+                        stub.fail_next -= 1
+                if fail:
+                    self._reply("451 Temporary failure, try again")
+                    continue
+                rcpt_to.append(address)
+                self._reply("250 OK")
+            elif command == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if chunk in (b".\r\n", b".\n", b""):
+                        break
+                    if chunk.startswith(b".."):
+                        chunk = chunk[1:]
+                    data.append(chunk)
+                with stub.lock:
+                    stub.messages.append({
+                        "mail_from": mail_from,
+                        "rcpt_to": rcpt_to,
+                        "message": message_from_bytes(b"".join(data), policy=default),
+                    })
+                self._reply("250 OK: queued")
+            elif command in ("NOOP", "RSET"):
+                if command == "RSET":
+                    mail_from, rcpt_to = None, []
+                self._reply("250 OK")
+            elif command == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+class _ThreadedTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class SMTPStub:
+    """Context manager running the stub on a background thread.
+
+    `fail_next` makes the next N RCPT commands fail with a 451 so retries can be exercised.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, fail_next=0):
+        self.messages = []
+        self.connections = 0
+        self.fail_next = fail_next
+        self.lock = threading.Lock()
+        self.server = _ThreadedTCPServer((host, port), _SMTPHandler)
+        self.server.stub = self
+        self.host, self.port = self.server.server_address
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+def main():
+    import logging
+    from src.email_delivery import deliver
+
+    parser = argparse.ArgumentParser(description="Deliver the weekly report to a local SMTP stub")
+    parser.add_argument("--recipients", type=int, default=50, help="Number of fake recipients")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--fail-next", type=int, default=3, help="Transient failures to inject")
+    parser.add_argument("--attachment", default="outputs/detailed_theme_breakdown.pdf")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    with SMTPStub(fail_next=args.fail_next) as stub:
+        settings = {
+            "host": stub.host,
+            "port": stub.port,
+            "user": "reports@example.com",
+            "password": "stub",
+            "starttls": False,
+            "max_workers": args.workers,
+            "max_retries": 3,
+            "backoff_seconds": 0.05,
+        }
+        jobs = [
+            {
+                "recipients": [f"stakeholder{i}@example.com"],
+                "subject": "Weekly App Review Pulse (stub)",
+                "body": "Stub delivery test.",
+                "attachment_path": args.attachment,
+            }
+            for i in range(args.recipients)
+        ]
+        started = time.perf_counter()
+        report = deliver(jobs, settings)
+        elapsed = time.perf_counter() - started
+
+        print(f"Stub received {len(stub.messages)} messages over {stub.connections} connections "
+              f"in {elapsed:.2f}s; report: {report['sent']} sent, {report['failed']} failed, "
+              f"{sum(r['attempts'] for r in report['results'])} attempts.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Embedding-space taxonomy prototypes.
+
+Each taxonomy theme's description and keywords are embedded once with the same
+sentence model used for clustering and averaged into a unit prototype vector.
+Clusters (or single reviews) are then mapped to themes with one
+vectors x prototypes cosine-similarity matmul and a threshold.
+"""
+import os
+import json
+import hashlib
+import numpy as np
+
+from src.clustering import MODELS_DIR
+
+PROTOTYPES_PATH = os.path.join(MODELS_DIR, "taxonomy_prototypes.npz")
+OTHER_THEME = "Other / Emerging Issues"
+
+def load_config():
+    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "config.json")
+    with open(config_path, "r") as f:
+        return json.load(f)
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+def taxonomy_fingerprint(taxonomy, model_name):
+    payload = json.dumps(taxonomy, sort_keys=True) + model_name
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def build_prototypes(model, taxonomy):
+    """Embed every theme's description and keywords in one encode call."""
+    theme_names, texts, owners = [], [], []
+    for i, (theme_name, info) in enumerate(taxonomy.items()):
+        theme_names.append(theme_name)
+        for text in [info["description"]] + list(info["keywords"]):
+            texts.append(text)
+            owners.append(i)
+
+    embeddings = _normalize(model.encode(texts, show_progress_bar=False))
+    owners = np.asarray(owners)
+    prototypes = np.stack([embeddings[owners == i].mean(axis=0) for i in range(len(theme_names))])
+    return theme_names, _normalize(prototypes)
+
+def load_or_build_prototypes(model, taxonomy, model_name='all-MiniLM-L6-v2', path=PROTOTYPES_PATH):
+    """Cached prototypes, rebuilt only when the taxonomy or model changes."""
+    fingerprint = taxonomy_fingerprint(taxonomy, model_name)
+    if os.path.exists(path):
+        data = np.load(path)
+        if str(data["fingerprint"]) == fingerprint:
+            return [str(t) for t in data["theme_names"]], data["prototypes"]
+
+    print("Embedding taxonomy prototypes...")
+    theme_names, prototypes = build_prototypes(model, taxonomy)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(path, theme_names=np.array(theme_names), prototypes=prototypes,
+             fingerprint=np.array(fingerprint))
+    return theme_names, prototypes
+
+def cluster_centroids(embeddings, labels, num_clusters):
+    """Mean embedding per cluster in the full (unreduced) space."""
+    labels = np.asarray(labels)
+    sums = np.zeros((num_clusters, embeddings.shape[1]), dtype=np.float64)
+    np.add.at(sums, labels, embeddings)
+    counts = np.bincount(labels, minlength=num_clusters)[:, None]
+    return (sums / np.maximum(counts, 1)).astype(np.float32)
+
+def map_to_prototypes(vectors, theme_names, prototypes, threshold=None):
+    """Map each row (cluster centroid or review embedding) to its most similar theme.
+
+    Returns (theme names, best cosine similarities). Rows whose best similarity
+    is below the threshold fall back to "Other / Emerging Issues".
+    """
+    if threshold is None:
+        threshold = load_config().get("PROTOTYPE_THRESHOLD", 0.3)
+    similarities = _normalize(vectors) @ prototypes.T
+    best = similarities.argmax(axis=1)
+    best_sim = similarities[np.arange(len(best)), best]
+    names = [theme_names[b] if s >= threshold else OTHER_THEME for b, s in zip(best, best_sim)]
+    return names, best_sim
@@ -0,0 +1,292 @@
+"""Local HTTP service that tags single reviews with a theme in real time.
+
+The embedding model, persisted centroids and taxonomy are loaded once at start-up.
+Concurrent requests are coalesced into micro-batches so `encode` runs once per batch.
+
+    python -m src.theme_service --port 8765
+
+Endpoints:
+    POST /classify  {"text": "..."} or {"texts": ["...", "..."]}
+    GET  /stats     p50/p99 latency, throughput and batch sizes
+    GET  /alerts    emerging-issue alerts raised since the last re-clustering
+    GET  /health
+"""
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.clustering import load_theme_model
+from src.emerging_detector import EmergingIssueDetector
+from src.model_registry import load_sentence_model
+
+def load_config():
+    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "config.json")
+    with open(config_path, "r") as f:
+        return json.load(f)
+
+def load_taxonomy():
+    taxonomy_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "product_taxonomy.json")
+    with open(taxonomy_path, "r") as f:
+        return json.load(f)
+
+class ThemeClassifier:
+    """Nearest-centroid classifier over the persisted theme model."""
+
+    def __init__(self, model=None, theme_model=None, taxonomy=None, detector=None):
+        if model is None:
+            model = load_sentence_model()
+        self.model = model
+        self.detector = detector
+        theme_model = theme_model or load_theme_model()
+        self.reducer = theme_model["reducer"]
+        self.centroids = theme_model["centroids"]
+        self.theme_names = theme_model["theme_names"]
+        self._centroid_sq = (self.centroids ** 2).sum(axis=1)
+        taxonomy = taxonomy if taxonomy is not None else load_taxonomy()
+        self.descriptions = {
+            name: taxonomy.get(name, {}).get("description", "Emerging issues or uncategorized feedback.")
+            for name in set(self.theme_names)
+        }
+
+    def embed(self, texts):
+        embeddings = self.model.encode(texts, batch_size=len(texts), show_progress_bar=False)
+        if self.reducer is not None:
+            embeddings = self.reducer.transform(embeddings)
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def nearest(self, vectors):
+        """Return (cluster ids, euclidean distances) to the nearest centroid for each row."""
+        sq = (vectors ** 2).sum(axis=1)[:, None] - 2 * vectors @ self.centroids.T + self._centroid_sq
+        cluster_ids = sq.argmin(axis=1)
+        distances = np.sqrt(np.maximum(sq[np.arange(len(vectors)), cluster_ids], 0))
+        return cluster_ids, distances
+
+    def classify_batch(self, texts):
+        vectors = self.embed(texts)
+        cluster_ids, distances = self.nearest(vectors)
+        results = [
+            {
+                "theme_name": self.theme_names[c],
+                "description": self.descriptions[self.theme_names[c]],
+                "cluster_id": int(c),
+                "distance": round(float(d), 4),
+            }
+            for c, d in zip(cluster_ids, distances)
+        ]
+        if self.detector is not None:
+            for result, vector, text in zip(results, vectors, texts):
+                observed = self.detector.observe(vector, text=text)
+                result["is_outlier"] = observed["is_outlier"]
+                result["emerging_group"] = observed["group_id"]
+        return results
+
+class LatencyStats:
+    """Rolling request latencies and batch sizes for the /stats endpoint."""
+
+    def __init__(self, window=10000):
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+        self.finished_at = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=1000)
+        self.model_ms = deque(maxlen=1000)
+        self.total = 0
+
+    def record_request(self, latency_ms):
+        with self.lock:
+            self.latencies.append(latency_ms)
+            self.finished_at.append(time.perf_counter())
+            self.total += 1
+
+    def record_batch(self, size, model_ms):
+        with self.lock:
+            self.batch_sizes.append(size)
+            self.model_ms.append(model_ms)
+
+    def snapshot(self):
+        with self.lock:
+            latencies = np.array(self.latencies)
+            finished = list(self.finished_at)
+            batch_sizes = np.array(self.batch_sizes)
+            model_ms = np.array(self.model_ms)
+            total = self.total
+
+        if len(latencies) == 0:
+            return {"requests": total}
+
+        elapsed = finished[-1] - finished[0]
+        throughput = (len(finished) - 1) / elapsed if elapsed > 0 else 0.0
+        per_request_model_ms = model_ms.sum() / batch_sizes.sum() if batch_sizes.sum() else 0.0
+        return {
+            "requests": total,
+            "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+            "throughput_rps": round(throughput, 1),
+            "mean_batch_size": round(float(batch_sizes.mean()), 2) if len(batch_sizes) else 0,
+            "model_ms_per_request": round(float(per_request_model_ms), 3),
+        }
+
+class MicroBatcher:
+    """Coalesces concurrent classify calls into batches for a single encode call.
+
+    A batch is flushed once it reaches `max_batch` texts or `max_wait_ms` after its
+    first text arrived, whichever comes first.
+    """
+
+    def __init__(self, classifier, stats, max_batch=64, max_wait_ms=5):
+        self.classifier = classifier
+        self.stats = stats
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = queue.Queue()
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def submit(self, text):
+        future = Future()
+        self.queue.put((text, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            texts = [text for text, _ in batch]
+            start = time.perf_counter()
+            try:
+                results = self.classifier.classify_batch(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.stats.record_batch(len(batch), (time.perf_counter() - start) * 1000)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+def make_handler(batcher, stats, detector=None):
+    class ClassifyHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/stats":
+                self._send_json(200, stats.snapshot())
+            elif self.path == "/alerts":
+                self._send_json(200, {"alerts": detector.alerts if detector is not None else []})
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/classify":
+                self._send_json(404, {"error": "not found"})
+                return
+
+            start = time.perf_counter()
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except (ValueError, json.JSONDecodeError):
+                self._send_json(400, {"error": "invalid JSON body"})
+                return
+
+            texts = None
+            if isinstance(payload, dict):
+                texts = payload["texts"] if "texts" in payload else [payload.get("text")]
+            if not isinstance(texts, list) or not texts or not all(isinstance(t, str) and t.strip() for t in texts):
+                self._send_json(400, {"error": "expected an object with a non-empty 'text' or a non-empty list 'texts'"})
+                return
+
+            try:
+                futures = [batcher.submit(t) for t in texts]
+                results = [f.result() for f in futures]
+            except Exception as e:
+                self._send_json(500, {"error": str(e)})
+                return
+
+            latency_ms = (time.perf_counter() - start) * 1000
+            stats.record_request(latency_ms)
+            if "texts" in payload:
+                self._send_json(200, {"results": results, "latency_ms": round(latency_ms, 2)})
+            else:
+                self._send_json(200, dict(results[0], latency_ms=round(latency_ms, 2)))
+
+        def log_message(self, format, *args):
+            pass
+
+    return ClassifyHandler
+
+class ThemeServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connections under bursts of concurrent clients
+    request_queue_size = 256
+
+def build_server(host, port, classifier=None, max_batch=None, max_wait_ms=None):
+    config = load_config()
+    max_batch = max_batch or config.get("SERVICE_MAX_BATCH", 64)
+    max_wait_ms = max_wait_ms if max_wait_ms is not None else config.get("SERVICE_MAX_WAIT_MS", 5)
+
+    if classifier is None:
+        try:
+            detector = EmergingIssueDetector.load()
+        except FileNotFoundError as e:
+            print(f"Warning: emerging-issue detection disabled. {e}")
+            detector = None
+        classifier = ThemeClassifier(detector=detector)
+    # Warm up so the first real request does not pay for lazy initialisation
+    classifier.embed(["warm up"])
+
+    stats = LatencyStats()
+    batcher = MicroBatcher(classifier, stats, max_batch=max_batch, max_wait_ms=max_wait_ms)
+    server = ThemeServer((host, port), make_handler(batcher, stats, classifier.detector))
+    server.classifier = classifier
+    return server
+
+def main():
+    config = load_config()
+    parser = argparse.ArgumentParser(description="Real-time review theme classification service")
+    parser.add_argument("--host", default=config.get("SERVICE_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=config.get("SERVICE_PORT", 8765))
+    parser.add_argument("--max-batch", type=int, default=None, help="Max texts per encode call")
+    parser.add_argument("--max-wait-ms", type=float, default=None, help="Max time to wait for a batch to fill")
+    args = parser.parse_args()
+
+    print("Loading embedding model and theme model...")
+    server = build_server(args.host, args.port, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    print(f"Theme service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down.")
+        if server.classifier.detector is not None:
+            server.classifier.detector.save_if_unchanged()
+        server.server_close()
+
+if __name__ == "__main__":
+    main()